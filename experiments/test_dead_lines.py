@@ -3,10 +3,15 @@
 Test script for dead pixel line correction.
 """
 
+import os
 import numpy as np
 import tifffile as tiff
 import sys
-from modules.image_processing.dead_pixel.dead_pixel_correction import correct_dead_lines
+from pathlib import Path
+from modules.image_processing.dead_pixel.dead_pixel_correction import correct_dead_lines_tile
+
+TILE = 512  # output tile edge; correction and compression stream one tile at a time
+LEVEL_CODECS = {"zlib", "deflate", "adobe_deflate", "zstd", "lzma", "brotli"}  # compressionargs level accepted
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -17,48 +22,84 @@ if __name__ == "__main__":
     
     input_path = sys.argv[1]
     
-    # Parse dead lines
-    dead_vertical = []
-    dead_horizontal = []
+    # Parse dead lines straight into sorted, de-duplicated int32 arrays (typed input for the correction kernel)
+    def parse_lines(arg: str) -> np.ndarray:
+        lines = np.fromiter((int(x) for x in arg.split(",") if x.strip()), dtype=np.int32)
+        return np.unique(lines)
+    
+    dead_vertical = np.empty(0, dtype=np.int32)
+    dead_horizontal = np.empty(0, dtype=np.int32)
     
     if len(sys.argv) > 2:
-        if sys.argv[2].strip():
-            dead_vertical = [int(x.strip()) for x in sys.argv[2].split(",") if x.strip()]
+        dead_vertical = parse_lines(sys.argv[2])
     
     if len(sys.argv) > 3:
-        if sys.argv[3].strip():
-            dead_horizontal = [int(x.strip()) for x in sys.argv[3].split(",") if x.strip()]
+        dead_horizontal = parse_lines(sys.argv[3])
     
     print(f"Loading: {input_path}")
-    img = tiff.imread(input_path)
+    # Decode exactly one page: stacks are inspected via page count, not loaded and then discarded
+    with tiff.TiffFile(input_path) as tf:
+        n_pages = len(tf.pages)
+        if n_pages > 1:
+            print(f"Warning: Image has {n_pages} pages, using first page")
+        page = tf.pages[0]
+        if page.is_memmappable:
+            # Map pixels straight from the file; only rows/columns the correction touches are read
+            img = tiff.memmap(input_path, page=0, mode="r")
+        else:
+            img = page.asarray()
     
-    # Handle multi-page/stacks
+    # Multi-dimensional first page (e.g. volumetric or sample planes): take the first 2D slice (a view)
     if img.ndim > 2:
-        if img.ndim == 3 and img.shape[0] == 1:
-            img = img[0]
-        elif img.ndim == 3:
-            print(f"Warning: Image has {img.shape[0]} pages, using first page")
-            img = img[0]
-        else:
+        if img.shape[0] != 1:
             print(f"Warning: Unexpected shape {img.shape}, using first slice")
+        while img.ndim > 2:
             img = img[0]
     
     print(f"Image shape: {img.shape}, dtype: {img.dtype}")
-    print(f"Dead vertical lines (columns): {dead_vertical}")
-    print(f"Dead horizontal lines (rows): {dead_horizontal}")
-    
-    # Correct dead lines
-    corrected = correct_dead_lines(
-        img,
-        dead_vertical_lines=dead_vertical,
-        dead_horizontal_lines=dead_horizontal
-    )
+    print(f"Dead vertical lines (columns): {dead_vertical.tolist()}")
+    print(f"Dead horizontal lines (rows): {dead_horizontal.tolist()}")
     
     # Save corrected image
-    base = input_path.rsplit(".", 1)[0]
-    ext = input_path.rsplit(".", 1)[1] if "." in input_path else "tiff"
-    out_path = f"{base}_deadlines_fixed.{ext}"
+    p = Path(input_path)
+    out_path = str(p.with_name(f"{p.stem}_deadlines_fixed{p.suffix or '.tiff'}"))
+    
+    # Compression: zlib level 1 by default (built into tifffile); XRAY_TIFF_COMPRESSION=none for raw output,
+    # or e.g. "zstd" when imagecodecs is installed. Horizontal predictor only applies to integer data.
+    # Level 1 is passed only to codecs whose encoder takes a level (packbits/lzw do not).
+    compression = os.environ.get("XRAY_TIFF_COMPRESSION", "zlib").strip().lower()
+    write_kwargs = {}
+    if compression and compression != "none":
+        write_kwargs["compression"] = compression
+        if compression in LEVEL_CODECS:
+            write_kwargs["compressionargs"] = {"level": 1}
+        write_kwargs["predictor"] = bool(np.issubdtype(img.dtype, np.integer))
+    
+    # Load -> correct -> save fused per tile: the full corrected image is never materialized
+    h, w = img.shape
+    
+    def corrected_tiles():
+        out_tile = np.empty((TILE, TILE), dtype=img.dtype)
+        for y0 in range(0, h, TILE):
+            for x0 in range(0, w, TILE):
+                y1, x1 = min(y0 + TILE, h), min(x0 + TILE, w)
+                yield correct_dead_lines_tile(
+                    img,
+                    slice(y0, y1),
+                    slice(x0, x1),
+                    dead_vertical_lines=dead_vertical,
+                    dead_horizontal_lines=dead_horizontal,
+                    out=out_tile[:y1 - y0, :x1 - x0],
+                )
     
     print(f"\nSaving corrected image: {out_path}")
-    tiff.imwrite(out_path, corrected, photometric="minisblack", compression=None)
+    with tiff.TiffWriter(out_path, bigtiff=False) as tw:
+        tw.write(
+            corrected_tiles(),
+            shape=img.shape,
+            dtype=img.dtype,
+            tile=(TILE, TILE),
+            photometric="minisblack",
+            **write_kwargs,
+        )
     print("Done!")
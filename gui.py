@@ -10,6 +10,9 @@ import sys
 import os
 import time
 import threading
+import queue
+import concurrent.futures
+import collections
 import pathlib
 import numpy as np
 
@@ -26,8 +29,11 @@ from modules.image_processing.banding.banding_correction import (
 from lib.image_viewport import ImageViewport
 from lib.settings import load_settings, save_settings, list_profiles, save_profile, apply_profile, set_current_profile
 from lib.app_api import AppAPI
-from modules.registry import discover_modules, all_extra_settings_keys
+from lib.integration_buffer import IntegrationBuffer, RunningMean
+from modules.registry import discover_modules, all_extra_settings_keys, modules_by_type
 from ui.constants import (
+    ACQ_MODE_NAMES,
+    DISP_SCALE_LABELS,
     DEFAULT_FRAME_W,
     DEFAULT_FRAME_H,
     DARK_DIR,
@@ -58,6 +64,11 @@ from ui import build_ui as ui_build_ui
 
 # Max rate for painting live view to texture (skip frames above this; no buffering)
 DISPLAY_PAINT_MAX_FPS = 30
+# Max rate for pushing progress/status/stats text and button states to DPG
+STATUS_UPDATE_MAX_HZ = 30
+# Render loop rate when nothing is happening (no acquisition, pending paint or recent input)
+IDLE_LOOP_MAX_FPS = 15
+IDLE_AFTER_INPUT_S = 1.0
 
 
 class XrayGUI:
@@ -76,19 +87,43 @@ class XrayGUI:
         self._prev_acq_mode = "idle"  # used to detect acquisition end for optional beam_supply turn-off
         self.acq_thread = None
         self.acq_stop = threading.Event()
+        # Set while acq_mode is "idle" (waiters block on it instead of polling acq_mode)
+        self._acq_idle_event = threading.Event()
+        self._acq_idle_event.set()
+        # Set by the main thread once last_captured_frame holds the finished run's frame
+        self._last_captured_event = threading.Event()
         self.integration_time = 1.0  # seconds between dual-shot pairs
 
         # Optional beam supply (e.g. ESP HV): Auto On before acquisition, Off when done
         self.beam_supply = None
 
-        # Frame data (protected by lock)
+        # Frame data (protected by lock). Published frames are replaced, never written in place: the producer
+        # builds each new array and swaps the pointer under frame_lock, so readers (display, auto-window,
+        # export, histogram) use the reference without copying. Copy only to hand a frame outside the app.
         self.frame_lock = threading.Lock()
         self.raw_frame = None           # float32 (H, W), latest single raw
         self.display_frame = None       # float32 (H, W), integrated result (mean of integration buffer)
-        self.frame_buffer = []          # list of float32 processed frames for integration (each frame ran full pipeline)
+        self.frame_buffer = IntegrationBuffer()  # last N float32 processed frames + running sum (each frame ran full pipeline)
         self.integration_n = 1          # integration size: we keep last N processed frames and display their mean
         self.new_frame_ready = threading.Event()
+        # Camera frames are handed to a pipeline worker thread; 1-deep so capture of the next frame overlaps processing
+        self._pipe_queue = queue.Queue(maxsize=1)
+        self._pipe_worker = threading.Thread(target=ui_pipeline.pipeline_worker_loop, args=(self,), daemon=True)
+        self._pipe_worker.start()
         self._last_display_paint_time = 0.0   # throttle live view updates to DISPLAY_PAINT_MAX_FPS (skip frames, no buffer)
+        self._display_painted_frame = 0       # frame_count at the last live paint
+        self._display_frames_skipped = 0      # frames superseded before they were painted (stats line)
+        self._tick_items = set()              # optional widgets that exist (ui.build_ui.TICK_ITEM_TAGS)
+        self._last_status_update_time = 0.0   # throttle status widgets to STATUS_UPDATE_MAX_HZ
+        self._status_widget_values = {}       # (tag, field) -> last value pushed; unchanged values are skipped
+        self._last_input_time = 0.0           # time.monotonic() of the last mouse/key event (idle pacing in run)
+        self._last_resize_key = None          # (panel w, h, zoom, pan_x, pan_y, aspect) of the last _resize_image
+        self._resize_pending = True           # re-fit the image on the next ticks (startup, viewport resize)
+        self._machine_module_tick_callbacks = []  # called every render tick; machine modules append in build_ui
+        self._profiles_cache = None           # profile names for the Settings Load combo (None = not scanned yet)
+
+        # Background writer for file output off the UI thread (settings writes, TIFF copies of dark/flat masters)
+        self._io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
         # Dark and flat fields (loaded after _apply_loaded_settings so integration_time is restored first)
         self.dark_field = None
@@ -98,6 +133,7 @@ class XrayGUI:
         # Which (time, gain) we loaded from / nearest when not applied (for status text)
         self._dark_loaded_time_gain = None   # (t, g) when dark loaded from file
         self._dark_nearest_time_gain = None  # (t, g) when no dark applied (nearest too far)
+        self._dark_flat_status_dirty = True  # dark/flat changed off the UI path; status widgets refresh on next tick
         self._flat_loaded_time_gain = None
         self._flat_nearest_time_gain = None
 
@@ -161,12 +197,16 @@ class XrayGUI:
         self._settings_save_deadline = 0.0
         self._settings_save_scope = "window"  # "window" or "full"
         self._settings_save_debounce_s = 0.35
+        self._settings_save_window_debounce_s = 1.0  # window min/max/hist-eq only
         # Guard to prevent callback feedback loops while syncing histogram lines <-> min/max controls
         self._window_sync_guard = False
+        # Last value pushed to (or typed into) each windowing widget; unchanged widgets are not re-set
+        self._window_widget_values = {}
         # Coalesce expensive texture/histogram redraws from rapid windowing callbacks
         self._window_refresh_pending = False
         # File section: image opened for preview (run through pipeline → becomes processed result; Save TIF then saves it)
         self._file_preview_frame = None  # float32 (H,W) or None
+        self._png_lut_cache = None  # (lo, hi, lut) uint8 windowing LUT for uint16 PNG exports (ui.file_ops)
         self._tiff_save_raw = False  # True when TIFF dialog was opened for "Save unprocessed TIF"
 
         # DPG ids (assigned in _build_ui)
@@ -185,9 +225,14 @@ class XrayGUI:
         # Histogram zoom: when set, override axis limits in _paint_texture_from_frame
         self._hist_zoom_lo = None
         self._hist_zoom_hi = None
+        self._hist_axis_cache = None   # ((axis_lo, axis_hi, x_lo, x_hi), bin centers) last applied to the plot
 
         # Discover modules first so we can load/save their settings
         self._discovered_modules = discover_modules()
+        self._modules_by_type = modules_by_type(self._discovered_modules)  # type -> list (detector/pipeline pre-sorted)
+        # Settings detector dropdown labels, formatted once: module name -> label and label -> module name
+        self._detector_labels = {m["name"]: self._detector_combo_label(m) for m in self._modules_by_type["detector"]}
+        self._detector_by_label = {label: name for name, label in self._detector_labels.items()}
         self._extra_settings_keys = all_extra_settings_keys(self._discovered_modules)
         self._loaded_settings = load_settings(extra_keys=self._extra_settings_keys)
         self._apply_loaded_settings(self._loaded_settings)
@@ -195,23 +240,42 @@ class XrayGUI:
         self._load_dark_field()
         self._load_flat_field()
         # _disp_w, _disp_h set in _build_ui from frame_width/frame_height and disp_scale
+        self._disp_tex_buf = None    # float32 (H/disp_scale, W/disp_scale), reused by frame_to_texture
+        self._disp_row_buf = None    # float32 (H, W/disp_scale) column-block sums, reused by downsample_for_display
+        self._disp_rgba_buf = None   # float32 RGBA texture data, reused by gray_to_rgba
+        self._win_tmp_f32 = None     # float32 windowed display frame, reused by frame_to_texture
+        self._histeq_idx_u16 = None  # uint16 histogram-equalization bin indices, reused by frame_to_texture
         # _acquisition_mode_map: label -> mode_id, set in _build_ui from camera_module.get_acquisition_modes()
         self._acquisition_mode_map = {}
         # Image alteration pipeline: list of (pipeline_slot, process_frame) built in _build_ui
         self._alteration_pipeline = []
+        self._pipeline_slot_list = []   # slot of each _alteration_pipeline step, ascending
         # Frame after last step with slot < DISTORTION_PREVIEW_SLOT (for live distortion/crop preview)
         self._frame_before_distortion = None
         # Steps with slot >= DISTORTION_PREVIEW_SLOT (pincushion, mustache, autocrop) for re-run on slider change
         self._distortion_crop_pipeline = []
         # Collect N frames with pipeline run only up to a slot (for dark/flat capture by their modules)
         self._capture_max_slot = None
-        self._capture_frames_collect = []
+        self._capture_stack = RunningMean()   # running mean of the frames collected so far
         self._capture_n = 0
         self._capture_frames_ready = threading.Event()
+        self._pipeline_error = None  # last pipeline worker exception since the current capture/request started
         # Per-frame pipeline cache for modules: incoming frame before each module step.
         self._pipeline_frame_token = 0
         self._pipeline_module_cache = {}   # module_name -> {"token": int, "slot": int, "frame": np.ndarray}
+        self._pipeline_incoming_bufs = {}  # module_name -> two reused arrays for snapshots of pipeline buffers
         self._pipeline_module_slots = {}   # module_name -> slot
+        # Per-step "[Pipeline]" diagnostics (developer toggle; off so live frames skip the sampling).
+        # Lines are kept in a bounded ring and printed on demand with _dump_pipeline_log().
+        self._pipeline_log_enabled = False
+        self._pipeline_log = collections.deque(maxlen=4096)
+        # Steps whose process_frame accepts out= (write into a reused pipeline buffer instead of allocating)
+        self._pipeline_out_steps = set()
+        self._pipeline_bufs = None          # (buf_a, buf_b) float32, ping-ponged between out= steps
+        # Modules' get_params_key(gui) (hashable step parameters) and last distortion-preview outputs
+        self._pipeline_params_key_fns = {}  # module_name -> get_params_key
+        self._pipeline_modules = {}  # module_name -> module object (dark/flat capture entry points)
+        self._preview_step_cache = {}       # module_name -> (input frame, params key, output frame)
 
     def _apply_loaded_settings(self, s: dict):
         """Apply loaded settings dict to self (used at startup)."""
@@ -240,6 +304,8 @@ class XrayGUI:
         self.deconv_sigma = max(0.2, min(10.0, float(s.get("deconv_sigma", 1.0))))
         self.deconv_iterations = max(1, min(100, int(s.get("deconv_iterations", 10))))
         self.disp_scale = max(1, min(4, int(s.get("disp_scale", 1))))  # 1=full, 2=half, 4=quarter
+        self.integration_float16 = bool(s.get("integration_float16", False))  # no UI; set in settings.json
+        self.frame_buffer.set_storage_dtype(np.float16 if self.integration_float16 else np.float32)
         # Last folder used for open/save file dialogs; default to app/captures when not set or invalid
         last_dir = (s.get("last_file_dialog_dir") or "").strip()
         if last_dir and pathlib.Path(last_dir).is_dir():
@@ -269,13 +335,18 @@ class XrayGUI:
 
     def _update_integrated_display(self) -> None:
         """Set display_frame to the integrated result: mean of the last N processed frames in the buffer."""
-        if not self.frame_buffer:
+        integrated = self.frame_buffer.mean()
+        if integrated is None:
             return
-        self.display_frame = np.mean(self.frame_buffer, axis=0)
+        self.display_frame = integrated
 
     def submit_raw_frame(self, frame):
-        """Called by camera module for each acquired frame. Runs dark/flat, corrections, buffer, display."""
-        ui_pipeline.push_frame(self, frame)
+        """Called by camera module for each acquired frame. Queues it for the pipeline worker (dark/flat, corrections, buffer, display)."""
+        ui_pipeline.submit_frame(self, frame)
+
+    def wait_pipeline_idle(self):
+        """Block until every submitted frame has been through the pipeline."""
+        ui_pipeline.wait_pipeline_idle(self)
 
     def _request_settings_save(self, scope: str = "full", debounce_s: float = None):
         """Schedule debounced settings save; full scope overrides window-only scope."""
@@ -323,18 +394,22 @@ class XrayGUI:
     def _load_dark_field(self):
         """Load nearest master dark for current integration time, gain and resolution (within threshold)."""
         ui_dark_flat.load_dark_field(self)
+        self._dark_flat_status_dirty = True
 
     def _save_dark_field(self):
         """Save master dark for current integration time, gain and resolution in camera subfolder."""
         ui_dark_flat.save_dark_field(self)
+        self._dark_flat_status_dirty = True
 
     def _load_flat_field(self):
         """Load nearest master flat for current integration time, gain and resolution (within threshold)."""
         ui_dark_flat.load_flat_field(self)
+        self._dark_flat_status_dirty = True
 
     def _save_flat_field(self):
         """Save master flat for current integration time, gain and resolution in camera subfolder."""
         ui_dark_flat.save_flat_field(self)
+        self._dark_flat_status_dirty = True
 
     def _on_dark_flat_params_changed(self):
         """Call when integration time or gain changes so dark/flat nearest-match and status are refreshed."""
@@ -366,6 +441,9 @@ class XrayGUI:
     def _log_pipeline_step(self, context: str, token: int, slot: int, module_name: str, frame_in, frame_out):
         ui_pipeline.log_pipeline_step(self, context, token, slot, module_name, frame_in, frame_out)
 
+    def _dump_pipeline_log(self, clear: bool = True):
+        ui_pipeline.dump_pipeline_log(self, clear)
+
     def _push_frame(self, frame):
         """Apply alteration pipeline; buffer and signal. Delegates to ui.pipeline."""
         ui_pipeline.push_frame(self, frame)
@@ -434,13 +512,14 @@ class XrayGUI:
                 self._progress_text = ""
         # Switch to live view so the display updates during acquisition (Start button and request_integration e.g. CT).
         self._display_mode = "live"
+        self._acq_idle_event.clear()
         self.acq_mode = mode
         self.acq_stop.clear()
         self._progress = 0.0
-        # Clear capture state if leftover from dark/flat capture (so frames go to frame_buffer, not _capture_frames_collect)
+        # Clear capture state if leftover from dark/flat capture (so frames go to frame_buffer, not _capture_stack)
         if not getattr(self, "_capture_skip_beam", False):
             self._capture_max_slot = None
-            self._capture_frames_collect = []
+            self._capture_stack.clear()
             self._capture_n = 0
         # Always clear buffer so display uses only this run's frames (single shot, Capture N, or request_integration)
         self.clear_frame_buffer()
@@ -477,31 +556,35 @@ class XrayGUI:
             mode = "capture_n"
         # Leave integration_n as num_frames; do not override to 1 for single/dual (workflow e.g. CT sets N).
         self.last_captured_frame = None
-        self._last_integration_fail_reason = None  # "timeout" | "stopped" | "no_frame" when returning None
+        self._last_captured_event.clear()
+        self._last_integration_fail_reason = None  # "timeout" | "stopped" | "no_frame" | "pipeline_error" when returning None
+        self._pipeline_error = None
         self._workflow_request_active = True
         try:
             self._start_acquisition(mode)
             t0 = time.time()
-            while self.acq_mode != "idle":
+            # Woken as soon as the worker goes idle; the timeout only bounds how often stop/timeout are checked
+            while not self._acq_idle_event.wait(timeout=0.2):
                 if self.acq_stop.is_set():
                     self._stop_acquisition()
                     self._last_integration_fail_reason = "stopped"
                     return None
                 if (time.time() - t0) > timeout_seconds:
                     self._stop_acquisition()
-                    self._last_integration_fail_reason = "timeout"
+                    self._last_integration_fail_reason = "pipeline_error" if self._pipeline_error else "timeout"
                     return None
-                time.sleep(0.05)
             # Acquisition is idle; last_captured_frame is set by main thread in _render_tick. Wait for pipeline
-            # to finish and main thread to copy display_frame -> last_captured_frame (can take ~1 s with many steps).
-            wait_end = time.time() + 3.0  # allow up to 3 s for pipeline + main-thread tick
+            # to finish and main thread to publish display_frame -> last_captured_frame (can take ~1 s with many steps).
             out = None
-            while time.time() < wait_end:
+            if self._last_captured_event.wait(timeout=3.0):  # allow up to 3 s for pipeline + main-thread tick
                 with self.frame_lock:
-                    if self.last_captured_frame is not None:
-                        out = self.last_captured_frame.copy()
-                        break
-                time.sleep(0.05)
+                    captured = self.last_captured_frame
+                if captured is not None:
+                    out = captured.copy()
+            if self._pipeline_error is not None:
+                # A frame of this integration was dropped: do not return a short average as if it were complete
+                self._last_integration_fail_reason = "pipeline_error"
+                return None
             if out is None:
                 self._last_integration_fail_reason = "no_frame"
             return out
@@ -546,7 +629,7 @@ class XrayGUI:
 
     def _update_display(self):
         """Called from main thread when new_frame_ready is set. Only updates texture when showing live."""
-        ui_display.update_display(self)
+        return ui_display.update_display(self)
 
     def _refresh_distortion_preview(self):
         """Re-run distortion+crop steps on the last pre-distortion frame and repaint."""
@@ -554,7 +637,7 @@ class XrayGUI:
 
     def _force_image_refresh(self):
         """Force the image widget to re-bind/redraw with the current texture (e.g. after Apply/Revert)."""
-        self._resize_image()
+        self._resize_image(force=True)
 
     def _get_display_max_value(self) -> float:
         """Max display/windowing value from current camera bit depth (12/14/16-bit)."""
@@ -584,13 +667,17 @@ class XrayGUI:
         return float(s)
 
     def _update_alteration_dark_flat_status(self):
-        """Sync dark/flat status in alteration module UIs when they exist."""
-        if dpg.does_item_exist("dark_correction_status"):
+        """Sync dark/flat status in the Dark/Flat Field sections and alteration module UIs when they exist."""
+        if "dark_status" in self._tick_items:
+            self._push_status_widget("dark_status", "value", self._dark_status_text())
+        if "flat_status" in self._tick_items:
+            self._push_status_widget("flat_status", "value", self._flat_status_text())
+        if "dark_correction_status" in self._tick_items:
             s = f"Active ({self.dark_field.shape[1]}×{self.dark_field.shape[0]})" if self.dark_field is not None else "No dark loaded"
-            dpg.set_value("dark_correction_status", s)
-        if dpg.does_item_exist("flat_correction_status"):
+            self._push_status_widget("dark_correction_status", "value", s)
+        if "flat_correction_status" in self._tick_items:
             s = f"Active ({self.flat_field.shape[1]}×{self.flat_field.shape[0]})" if self.flat_field is not None else "No flat loaded"
-            dpg.set_value("flat_correction_status", s)
+            self._push_status_widget("flat_correction_status", "value", s)
 
     def _cb_integ_time_changed(self, sender=None, app_data=None):
         """When integration dropdown changes, load master dark and flat for that time if present."""
@@ -613,18 +700,19 @@ class XrayGUI:
         self._stop_acquisition()
 
     def _cb_auto_window(self, sender=None, app_data=None):
+        # Read-only use of the published frame (see frame_lock in __init__), so no copy
         if self._main_view_preview_active and self._preview_frame is not None:
-            frame = self._preview_frame.copy()
+            frame = self._preview_frame
         else:
             with self.frame_lock:
-                if self.display_frame is None:
-                    return
-                frame = self.display_frame.copy()
-        analysis = self._get_histogram_analysis_pixels(frame)
-        if analysis.size == 0:
+                frame = self.display_frame
+            if frame is None:
+                return
+        # Same analysis pixels as the histogram (cached per frame); one histogram pass for both percentiles
+        pct = ui_display.frame_percentiles(self, frame, (1, 99))
+        if pct is None:
             return
-        lo = float(np.percentile(analysis, 1))
-        hi = float(np.percentile(analysis, 99))
+        lo, hi = pct
         # Keep some visual headroom so lines are not pinned to edges after auto-fit.
         margin = 100.0
         lo -= margin
@@ -638,14 +726,7 @@ class XrayGUI:
             self.win_min += inset
             self.win_max -= inset
             self.win_min, self.win_max = self._clamp_window_bounds(self.win_min, self.win_max)
-        self._window_sync_guard = True
-        try:
-            dpg.set_value("win_min_drag", self.win_min)
-            dpg.set_value("win_max_drag", self.win_max)
-            dpg.set_value("hist_min_line", self.win_min)
-            dpg.set_value("hist_max_line", self.win_max)
-        finally:
-            self._window_sync_guard = False
+        self._sync_window_widgets()
         self._request_window_refresh()
 
     def _cb_hist_eq_toggle(self, sender, value):
@@ -653,18 +734,33 @@ class XrayGUI:
         self._request_window_refresh()
         self._save_settings()
 
-    def _cb_win_min_changed(self, sender, value):
-        if self._window_sync_guard:
-            return
-        self.win_min, self.win_max = self._clamp_window_bounds(float(value), float(self.win_max))
+    def _sync_window_widgets(self, edited_tag=None, edited_value=None):
+        """
+        Push win_min/win_max to the min/max drags and histogram lines. Only widgets whose shown value
+        differs are set: the widget the user just edited (edited_tag) already shows its value unless clamped.
+        """
+        shown = self._window_widget_values
+        if edited_tag is not None:
+            shown[edited_tag] = edited_value
         self._window_sync_guard = True
         try:
-            dpg.set_value("win_min_drag", self.win_min)
-            dpg.set_value("win_max_drag", self.win_max)
-            dpg.set_value("hist_min_line", self.win_min)
-            dpg.set_value("hist_max_line", self.win_max)
+            for tag, val in (
+                ("win_min_drag", self.win_min),
+                ("win_max_drag", self.win_max),
+                ("hist_min_line", self.win_min),
+                ("hist_max_line", self.win_max),
+            ):
+                if shown.get(tag) != val:
+                    dpg.set_value(tag, val)
+                    shown[tag] = val
         finally:
             self._window_sync_guard = False
+
+    def _cb_win_min_changed(self, sender, value):
+        if self._window_sync_guard:
+            return
+        self.win_min, self.win_max = self._clamp_window_bounds(float(value), float(self.win_max))
+        self._sync_window_widgets("win_min_drag", float(value))
         self._request_window_refresh()
         self._save_windowing_settings_fast()
 
@@ -672,14 +768,7 @@ class XrayGUI:
         if self._window_sync_guard:
             return
         self.win_min, self.win_max = self._clamp_window_bounds(float(self.win_min), float(value))
-        self._window_sync_guard = True
-        try:
-            dpg.set_value("win_min_drag", self.win_min)
-            dpg.set_value("win_max_drag", self.win_max)
-            dpg.set_value("hist_min_line", self.win_min)
-            dpg.set_value("hist_max_line", self.win_max)
-        finally:
-            self._window_sync_guard = False
+        self._sync_window_widgets("win_max_drag", float(value))
         self._request_window_refresh()
         self._save_windowing_settings_fast()
 
@@ -690,13 +779,7 @@ class XrayGUI:
         if isinstance(val, (list, tuple)):
             val = val[0]
         self.win_min, self.win_max = self._clamp_window_bounds(float(val), float(self.win_max))
-        self._window_sync_guard = True
-        try:
-            dpg.set_value("win_min_drag", self.win_min)
-            dpg.set_value("win_max_drag", self.win_max)
-            dpg.set_value("hist_max_line", self.win_max)
-        finally:
-            self._window_sync_guard = False
+        self._sync_window_widgets("hist_min_line", float(val))
         self._request_window_refresh()
         self._save_windowing_settings_fast()
 
@@ -707,13 +790,7 @@ class XrayGUI:
         if isinstance(val, (list, tuple)):
             val = val[0]
         self.win_min, self.win_max = self._clamp_window_bounds(float(self.win_min), float(val))
-        self._window_sync_guard = True
-        try:
-            dpg.set_value("win_min_drag", self.win_min)
-            dpg.set_value("win_max_drag", self.win_max)
-            dpg.set_value("hist_min_line", self.win_min)
-        finally:
-            self._window_sync_guard = False
+        self._sync_window_widgets("hist_max_line", float(val))
         self._request_window_refresh()
         self._save_windowing_settings_fast()
 
@@ -740,7 +817,7 @@ class XrayGUI:
             return
         def _run():
             try:
-                mod = __import__("modules.image_processing.dark_correction", fromlist=["capture_dark"])
+                mod = self._pipeline_modules["dark_correction"]  # imported when the pipeline was built
                 mod.capture_dark(self)
             except Exception as e:
                 self.api.set_status_message(f"Dark capture error: {e}")
@@ -758,8 +835,6 @@ class XrayGUI:
         if path.exists():
             path.unlink()
         self._status_msg = "Dark field cleared"
-        if dpg.does_item_exist("dark_status"):
-            dpg.set_value("dark_status", self._dark_status_text())
         self._update_alteration_dark_flat_status()
 
     def _cb_capture_flat(self, sender=None, app_data=None):
@@ -773,7 +848,7 @@ class XrayGUI:
             return
         def _run():
             try:
-                mod = __import__("modules.image_processing.flat_correction", fromlist=["capture_flat"])
+                mod = self._pipeline_modules["flat_correction"]  # imported when the pipeline was built
                 mod.capture_flat(self)
             except Exception as e:
                 self.api.set_status_message(f"Flat capture error: {e}")
@@ -791,8 +866,6 @@ class XrayGUI:
         if path.exists():
             path.unlink()
         self._status_msg = "Flat field cleared"
-        if dpg.does_item_exist("flat_status"):
-            dpg.set_value("flat_status", self._flat_status_text())
         self._update_alteration_dark_flat_status()
 
     def _cb_banding_enabled(self, sender=None, app_data=None):
@@ -845,24 +918,35 @@ class XrayGUI:
         self._save_settings()
 
     def _get_current_display_frame(self):
-        """Return the frame that is currently shown (for snapshot when applying deconv)."""
+        """
+        Return the frame that is currently shown (for snapshot when applying deconv), by reference:
+        display_frame / _deconv_raw_frame / _deconv_result are always rebound, never written in place.
+        Callers that modify the frame copy it themselves.
+        """
         if self._display_mode == "live":
             with self.frame_lock:
-                return self.display_frame.copy() if self.display_frame is not None else None
+                return self.display_frame
         if self._display_mode == "raw":
-            return self._deconv_raw_frame.copy() if self._deconv_raw_frame is not None else None
-        return self._deconv_result.copy() if self._deconv_result is not None else None
+            return self._deconv_raw_frame
+        return self._deconv_result
 
     def _get_export_frame(self):
         """
-        Return frame for file export/save.
+        Return frame for file export/save (a reference: read it, do not modify it).
         Prefer final live pipeline output (includes downstream modules like autocrop),
         independent of temporary raw/deconvolved display modes.
+        Frames are replaced, never written in place, so no copy is needed; also called every render
+        tick to enable the Save TIFF button.
         """
         with self.frame_lock:
-            if self.display_frame is not None:
-                return self.display_frame.copy()
-        return self._get_current_display_frame()
+            frame = self.display_frame
+        if frame is not None:
+            return frame
+        if self._display_mode == "raw":
+            return self._deconv_raw_frame
+        if self._display_mode == "live":
+            return None
+        return self._deconv_result
 
     def _cb_export_png(self, sender=None, app_data=None):
         ui_file_ops.cb_export_png(self)
@@ -898,6 +982,19 @@ class XrayGUI:
     def _cb_file_selected(self, sender, app_data):
         ui_file_ops.cb_file_selected(self, sender, app_data)
 
+    def _cb_user_input(self, sender=None, app_data=None):
+        self._last_input_time = time.monotonic()
+
+    def _loop_is_idle(self) -> bool:
+        """True when the render loop has nothing to show soon: no acquisition, pending paint or recent input."""
+        return (
+            self.acq_mode == "idle"
+            and not self.new_frame_ready.is_set()
+            and not self._window_refresh_pending
+            and self._pending_preview_frame is None
+            and time.monotonic() - self._last_input_time >= IDLE_AFTER_INPUT_S
+        )
+
     def _cb_mouse_wheel(self, sender, app_data):
         """Handle mouse wheel scroll: histogram zoom when over hist plot, image zoom when over image panel."""
         if self._mouse_over_histogram():
@@ -966,6 +1063,7 @@ class XrayGUI:
             new_lo, new_hi = dmax - new_span, dmax
         self._hist_zoom_lo = max(0.0, new_lo)
         self._hist_zoom_hi = min(dmax, new_hi)
+        self._hist_axis_cache = None  # limits set here: next paint re-applies its own
         dpg.set_axis_limits("hist_x", self._hist_zoom_lo, self._hist_zoom_hi)
 
     def _cb_mouse_click(self, sender, app_data):
@@ -990,23 +1088,24 @@ class XrayGUI:
     # ── Build UI ────────────────────────────────────────────────────
 
     def _build_ui(self):
-        """Build full UI (frame size, pipeline, texture, dialogs, main window, settings window). Delegates to ui.build_ui."""
+        """Build full UI (frame size, pipeline, texture, dialogs, main window). Delegates to ui.build_ui."""
         ui_build_ui.build_ui(self)
 
     def _cb_show_settings(self, sender=None, app_data=None):
         """Open the Settings window and sync combo and module checkboxes to current values."""
+        if not dpg.does_item_exist("settings_window"):
+            ui_build_ui.build_settings_window(self)  # built on first open, not at startup
         if dpg.does_item_exist("disp_scale_combo"):
-            _labels = {"1": "1 - Full", "2": "2 - Half", "4": "4 - Quarter"}
-            dpg.set_value("disp_scale_combo", _labels.get(str(self.disp_scale), "1 - Full"))
+            dpg.set_value("disp_scale_combo", DISP_SCALE_LABELS.get(str(self.disp_scale), "1 - Full"))
         # Sync detector dropdown (only one detector can be selected; fix legacy configs with multiple)
-        detector_mods = [m for m in self._discovered_modules if m.get("type") == "detector"]
+        detector_mods = self._modules_by_type["detector"]
         if detector_mods:
             enabled_list = [m for m in detector_mods if self._module_enabled.get(m["name"], False)]
             if len(enabled_list) > 1:
                 keep = max(enabled_list, key=lambda x: x.get("camera_priority", 0))
                 for m in detector_mods:
                     self._module_enabled[m["name"]] = m["name"] == keep["name"]
-            enabled = next((self._detector_combo_label(m) for m in detector_mods if self._module_enabled.get(m["name"], False)), None)
+            enabled = next((self._detector_labels[m["name"]] for m in detector_mods if self._module_enabled.get(m["name"], False)), None)
             if dpg.does_item_exist("settings_detector_combo"):
                 dpg.set_value("settings_detector_combo", enabled or "None")
         for m in self._discovered_modules:
@@ -1017,7 +1116,9 @@ class XrayGUI:
                 dpg.set_value(tag, self._module_enabled.get(m["name"], False))
         # Refresh profile list in Load combo and set profile name field to current profile for quick save/overwrite
         if dpg.does_item_exist("profile_load_combo"):
-            profiles = list_profiles()
+            if self._profiles_cache is None:
+                self._profiles_cache = list_profiles()  # scanned on first open; refreshed by Save as profile
+            profiles = self._profiles_cache
             dpg.configure_item("profile_load_combo", items=profiles if profiles else ["(no profiles saved)"], default_value=profiles[0] if profiles else "(no profiles saved)")
         if dpg.does_item_exist("profile_name_input"):
             current = self._loaded_settings.get("current_profile", "") or ""
@@ -1042,9 +1143,9 @@ class XrayGUI:
 
     def _cb_detector_module_combo(self, sender=None, app_data=None):
         """One detector only: set selected module enabled, all other detectors disabled."""
-        detector_mods = [m for m in self._discovered_modules if m.get("type") == "detector"]
-        for m in detector_mods:
-            self._module_enabled[m["name"]] = (app_data == self._detector_combo_label(m))
+        selected = self._detector_by_label.get(app_data)  # None for "None"
+        for m in self._modules_by_type["detector"]:
+            self._module_enabled[m["name"]] = (m["name"] == selected)
         self._save_settings()
         if app_data and app_data != "None":
             self._status_msg = f"Detector: {app_data} (applies on next startup)"
@@ -1081,10 +1182,11 @@ class XrayGUI:
         try:
             s = self._get_current_settings_dict()
             save_profile(name, s, extra_keys=self._extra_settings_keys)
-            set_current_profile(name)
+            # settings.json is only written on the I/O worker, so this lands in order with queued saves
+            self._io_executor.submit(set_current_profile, name)
             self._status_msg = f"Profile '{name}' saved"
             dpg.set_value("profile_name_input", name)
-            profiles = list_profiles()
+            profiles = self._profiles_cache = list_profiles()
             if dpg.does_item_exist("profile_load_combo"):
                 dpg.configure_item("profile_load_combo", items=profiles, default_value=name if name in profiles else profiles[0] if profiles else "(no profiles saved)")
         except Exception as e:
@@ -1097,7 +1199,10 @@ class XrayGUI:
             self._status_msg = "No profile selected"
             return
         try:
-            apply_profile(sel, extra_keys=self._extra_settings_keys)
+            # Drop the pending debounced save (it would carry the old UI values) and write the profile on the
+            # I/O worker after any queued writes; waiting on it drains the queue before execv replaces us
+            self._settings_save_pending = False
+            self._io_executor.submit(apply_profile, sel, extra_keys=self._extra_settings_keys).result()
             self._status_msg = f"Profile '{sel}' applied; restarting..."
             dpg.stop_dearpygui()
             import os
@@ -1108,149 +1213,203 @@ class XrayGUI:
 
     # ── Main loop ───────────────────────────────────────────────────
 
-    def _resize_image(self):
-        """Scale image to fill available space while maintaining aspect ratio, with zoom support."""
+    def _resize_image(self, force: bool = False) -> bool:
+        """
+        Scale image to fill available space while maintaining aspect ratio, with zoom support.
+        Skipped unless the panel size, zoom/pan or aspect changed (or force=True). Returns True when nothing
+        changed since the last call and the panel has a size, i.e. the layout has settled.
+        """
         if self.image_viewport is None:
-            return
+            return True
         try:
             pw, ph = dpg.get_item_rect_size("image_panel")
         except Exception:
-            return
-        
+            return False
+        vp = self.image_viewport
+        key = (pw, ph, vp.zoom, vp.pan_x, vp.pan_y, vp.aspect_ratio)
+        if not force and key == self._last_resize_key:
+            return pw > 0 and ph > 0
+        self._last_resize_key = key
+
         # Use viewport to calculate size and UV coordinates
-        img_w, img_h, uv_min, uv_max = self.image_viewport.resize(pw, ph, status_bar_height=115)
+        img_w, img_h, uv_min, uv_max = vp.resize(pw, ph, status_bar_height=115)
         dpg.configure_item("main_image", width=img_w, height=img_h, uv_min=uv_min, uv_max=uv_max)
+        return False
 
-    def _render_tick(self):
-        """Called every frame from the render loop."""
-        # Paint any preview requested from a worker (e.g. dark/flat capture) on main thread
-        with self.frame_lock:
-            pending = self._pending_preview_frame
-            use_hist = getattr(self, "_pending_preview_use_histogram", True)
-            self._pending_preview_frame = None
-            self._pending_preview_use_histogram = True
-        if pending is not None:
-            self._paint_preview_to_main_view(pending, use_histogram=use_hist)
-
-        # On transition from acquisition to idle: optional beam supply turn-off (skip if workflow keeps HV on, e.g. CT scan)
-        if self._prev_acq_mode != "idle" and self.acq_mode == "idle":
-            beam = getattr(self, "beam_supply", None)
-            if beam is not None and beam.wants_auto_on_off() and beam.is_connected():
-                if not getattr(self, "workflow_keep_beam_on", False):
-                    beam.turn_off()
-            # Expose stacked/processed frame for workflow modules (e.g. request_integration / CT capture)
-            with self.frame_lock:
-                if self.display_frame is not None:
-                    self.last_captured_frame = self.display_frame.copy()
-                else:
-                    self.last_captured_frame = None
-            # Reset deconv snapshot so raw/deconvolved views are "no frame" until user clicks Apply on this run's frame
-            self._deconv_raw_frame = None
-            self._deconv_result = None
-            # Reset microcontrast manual snapshot/result per completed run (same behavior as deconvolution snapshot)
-            self._microcontrast_raw_frame = None
-            self._microcontrast_snapshot_token = -1
-            self._microcontrast_deconv_frame = None
-            self._microcontrast_result = None
-            self._display_mode = "live"
-            # Repaint so user sees the last shot in live view (not stale raw/deconvolved)
-            with self.frame_lock:
-                if self.display_frame is not None:
-                    self._paint_texture_from_frame(self.display_frame.copy())
-        self._prev_acq_mode = self.acq_mode
-
-        if self.new_frame_ready.is_set():
-            self.new_frame_ready.clear()
-            now = time.time()
-            if now - self._last_display_paint_time >= (1.0 / DISPLAY_PAINT_MAX_FPS):
-                self._update_display()
-                self._last_display_paint_time = now
-
-        if self._window_refresh_pending:
-            self._window_refresh_pending = False
-            self._refresh_texture_from_settings()
+    def _cb_viewport_resized(self, sender=None, app_data=None):
+        """Viewport resized: re-fit the image on the next ticks (the image panel's size follows the viewport)."""
+        self._resize_pending = True
 
-        # Scale image to panel
-        self._resize_image()
-        # Flush pending debounced settings writes (main thread; safe for DPG access)
-        self._flush_pending_settings_save(force=False)
+    def _push_status_widget(self, tag: str, field: str, value):
+        """Set a widget's value ("value") or a configure_item field, skipping the DPG call when unchanged."""
+        key = (tag, field)
+        if self._status_widget_values.get(key) == value:
+            return
+        self._status_widget_values[key] = value
+        if field == "value":
+            dpg.set_value(tag, value)
+        else:
+            dpg.configure_item(tag, **{field: value})
 
+    def _update_status_widgets(self):
+        """Progress bar, status/stats/diagnostics text, dark/flat status and button states (rate-limited from _render_tick)."""
         # Update progress bar
-        dpg.set_value("progress_bar", self._progress)
+        self._push_status_widget("progress_bar", "value", self._progress)
         overlay = self._progress_text if self._progress_text else ""
-        dpg.configure_item("progress_bar", overlay=overlay)
+        self._push_status_widget("progress_bar", "overlay", overlay)
 
         # Update status text
         if self.acq_mode != "idle":
-            mode_names = {
-                "single": "Single Shot", "dual": "Dual Shot",
-                "continuous": "Continuous", "capture_n": "Capture N",
-                "dark": "Dark Capture", "flat": "Flat Capture",
-            }
-            status = mode_names.get(self.acq_mode, self.acq_mode)
+            status = ACQ_MODE_NAMES.get(self.acq_mode, self.acq_mode)
         else:
             status = "Idle"
         if self._status_msg:
             status += f"  --  {self._status_msg}"
-        dpg.set_value("status_text", status)
+        self._push_status_widget("status_text", "value", status)
 
         # Update stats line (during dark/flat capture show collect progress; otherwise show integration buffer)
         dark_str = " | Dark: active" if self.dark_field is not None else ""
         flat_str = " | Flat: active" if self.flat_field is not None else ""
         if getattr(self, "_capture_max_slot", None) is not None:
-            collect_n = len(getattr(self, "_capture_frames_collect", []))
+            collect_n = len(self._capture_stack)
             capture_total = getattr(self, "_capture_n", 0) or 1
             buf_n, buf_total = collect_n, capture_total
         else:
             buf_n = len(self.frame_buffer)
             buf_total = self.integration_n
-        stats = f"Frames: {self.frame_count} | FPS: {self.fps:.1f} | Buffer: {buf_n}/{buf_total}{dark_str}{flat_str}"
-        dpg.set_value("stats_text", stats)
+        skip_str = f" | Not shown: {self._display_frames_skipped}" if self._display_frames_skipped else ""
+        stats = f"Frames: {self.frame_count} | FPS: {self.fps:.1f} | Buffer: {buf_n}/{buf_total}{dark_str}{flat_str}{skip_str}"
+        self._push_status_widget("stats_text", "value", stats)
 
         # Update capture diagnostics (last frame)
-        dpg.set_value("diag_text", self._last_capture_diag or "--")
+        self._push_status_widget("diag_text", "value", self._last_capture_diag or "--")
 
-        # Update dark/flat status text (only when Dark/Flat Field sections exist)
-        if dpg.does_item_exist("dark_status"):
-            dpg.set_value("dark_status", self._dark_status_text())
-        if dpg.does_item_exist("flat_status"):
-            dpg.set_value("flat_status", self._flat_status_text())
-        self._update_alteration_dark_flat_status()
+        # Update dark/flat status text (only where the sections/modules exist; resolved once in build_ui) when
+        # a load/save/capture marked it dirty; UI callbacks that change dark/flat update it directly
+        if self._dark_flat_status_dirty:
+            self._dark_flat_status_dirty = False
+            self._update_alteration_dark_flat_status()
 
         # Disable deconv Apply/Revert during capture; Revert only when we have a saved raw
-        if dpg.does_item_exist("deconv_apply_btn"):
+        if "deconv_apply_btn" in self._tick_items:
             idle = self.acq_mode == "idle"
             has_frame = (self.display_frame is not None) or (self._deconv_raw_frame is not None)
-            dpg.configure_item("deconv_apply_btn", enabled=idle and has_frame)
-            dpg.configure_item("deconv_revert_btn", enabled=idle and self._deconv_raw_frame is not None)
+            self._push_status_widget("deconv_apply_btn", "enabled", idle and has_frame)
+            self._push_status_widget("deconv_revert_btn", "enabled", idle and self._deconv_raw_frame is not None)
 
         # File section: enable Save TIF when processed result exists; Save unprocessed TIF when raw frame exists
-        if dpg.does_item_exist("file_save_tiff_btn"):
-            dpg.configure_item("file_save_tiff_btn", enabled=(self._get_export_frame() is not None))
-        if dpg.does_item_exist("file_save_raw_tiff_btn"):
+        if "file_save_tiff_btn" in self._tick_items:
+            self._push_status_widget("file_save_tiff_btn", "enabled", (self._get_export_frame() is not None))
+        if "file_save_raw_tiff_btn" in self._tick_items:
             with self.frame_lock:
                 has_raw = self.raw_frame is not None
-            dpg.configure_item("file_save_raw_tiff_btn", enabled=has_raw)
+            self._push_status_widget("file_save_raw_tiff_btn", "enabled", has_raw)
+
+    def _render_tick(self):
+        """Called every frame from the render loop."""
+        # Paint any preview requested from a worker (e.g. dark/flat capture) on main thread.
+        # Unlocked peek first: the lock is only taken when a preview is actually pending.
+        if self._pending_preview_frame is not None:
+            with self.frame_lock:
+                pending = self._pending_preview_frame
+                use_hist = getattr(self, "_pending_preview_use_histogram", True)
+                self._pending_preview_frame = None
+                self._pending_preview_use_histogram = True
+            if pending is not None:
+                self._paint_preview_to_main_view(pending, use_histogram=use_hist)
+
+        # On transition from acquisition to idle: optional beam supply turn-off (skip if workflow keeps HV on, e.g. CT scan)
+        if self._prev_acq_mode != "idle" and self.acq_mode == "idle":
+            beam = getattr(self, "beam_supply", None)
+            if beam is not None and beam.wants_auto_on_off() and beam.is_connected():
+                if not getattr(self, "workflow_keep_beam_on", False):
+                    beam.turn_off()
+            # Expose stacked/processed frame for workflow modules (e.g. request_integration / CT capture)
+            # display_frame is replaced, never written in place: publish the same array (request_integration copies it)
+            with self.frame_lock:
+                final = self.display_frame
+                self.last_captured_frame = final
+            self._last_captured_event.set()
+            self._dark_flat_status_dirty = True  # a dark/flat capture may have just finished
+            # Reset deconv snapshot so raw/deconvolved views are "no frame" until user clicks Apply on this run's frame
+            self._deconv_raw_frame = None
+            self._deconv_result = None
+            # Reset microcontrast manual snapshot/result per completed run (same behavior as deconvolution snapshot)
+            self._microcontrast_raw_frame = None
+            self._microcontrast_snapshot_token = -1
+            self._microcontrast_deconv_frame = None
+            self._microcontrast_result = None
+            self._display_mode = "live"
+            # Repaint so user sees the last shot in live view (not stale raw/deconvolved); paint outside frame_lock
+            if final is not None:
+                self._paint_texture_from_frame(final)
+        self._prev_acq_mode = self.acq_mode
+
+        painted = False
+        if self.new_frame_ready.is_set():
+            # Skip-to-latest: while throttled the event stays set, so the next paint shows the newest frame
+            # (display_frame is a single slot) and the last frame of a burst is never left unpainted
+            now = time.time()
+            if now - self._last_display_paint_time >= (1.0 / DISPLAY_PAINT_MAX_FPS):
+                self.new_frame_ready.clear()
+                frame_no = self.frame_count
+                painted = bool(self._update_display())
+                self._last_display_paint_time = now
+                self._display_frames_skipped += max(0, frame_no - self._display_painted_frame - 1)
+                self._display_painted_frame = frame_no
+
+        # Window/hist-eq changes: coalesced to at most one repaint per DISPLAY_PAINT_MAX_FPS interval while
+        # dragging (the pending flag keeps the trailing update), and skipped when a live paint just used them
+        if self._window_refresh_pending:
+            now = time.time()
+            if painted:
+                self._window_refresh_pending = False
+            elif now - self._last_display_paint_time >= (1.0 / DISPLAY_PAINT_MAX_FPS):
+                self._window_refresh_pending = False
+                self._refresh_texture_from_settings()
+                self._last_display_paint_time = now
+
+        # Scale image to panel only after a viewport resize (zoom/pan and texture swaps resize directly);
+        # keep checking until the panel size stops changing, since DPG lays it out over the next frames
+        if self._resize_pending:
+            self._resize_pending = not self._resize_image()
+        # Flush pending debounced settings writes once due (main thread; safe for DPG access). The deadline
+        # is checked inline so ticks without a pending save cost one attribute test
+        if self._settings_save_pending and time.monotonic() >= self._settings_save_deadline:
+            self._flush_pending_settings_save(force=False)
+
+        now = time.time()
+        if now - self._last_status_update_time >= (1.0 / STATUS_UPDATE_MAX_HZ):
+            self._last_status_update_time = now
+            with dpg.mutex():  # one lock hold for the whole batch of widget updates
+                self._update_status_widgets()
 
         # Machine module tick callbacks (e.g. ESP HV state refresh)
-        for cb in getattr(self, "_machine_module_tick_callbacks", []):
-            try:
-                cb()
-            except Exception:
-                pass
+        if self._machine_module_tick_callbacks:
+            for cb in self._machine_module_tick_callbacks:
+                try:
+                    cb()
+                except Exception:
+                    pass
 
     def run(self):
         dpg.create_context()
         self._build_ui()
 
         dpg.create_viewport(title="X-ray acquisition", width=1200, height=800)
+        dpg.set_viewport_resize_callback(self._cb_viewport_resized)
         dpg.setup_dearpygui()
         dpg.show_viewport()
         dpg.set_primary_window("primary", True)
 
         while dpg.is_dearpygui_running():
+            t0 = time.monotonic()
             self._render_tick()
             dpg.render_dearpygui_frame()
+            # Full rate (vsync) while acquiring or interacting; otherwise pace to IDLE_LOOP_MAX_FPS so an
+            # idle window does not redraw at the display refresh rate
+            if self._loop_is_idle():
+                time.sleep(max(0.0, 1.0 / IDLE_LOOP_MAX_FPS - (time.monotonic() - t0)))
 
         # Cleanup
         self._flush_pending_settings_save(force=True)
@@ -1260,6 +1419,7 @@ class XrayGUI:
         if self.camera_module and self.camera_module.is_connected():
             self.camera_module.disconnect(self)
         dpg.destroy_context()
+        self._io_executor.shutdown(wait=True)  # finish queued settings / TIFF writes
 
 
 if __name__ == "__main__":
@@ -41,7 +41,7 @@ class AppAPI:
         return self._gui.request_integration(num_frames, timeout_seconds)
 
     def get_last_integration_fail_reason(self) -> Optional[str]:
-        """After request_integration() returns None: 'timeout', 'stopped', 'no_frame', 'not_connected', 'not_idle', 'supply_not_connected'."""
+        """After request_integration() returns None: 'timeout', 'stopped', 'no_frame', 'pipeline_error', 'not_connected', 'not_idle', 'supply_not_connected'."""
         return getattr(self._gui, "_last_integration_fail_reason", None)
 
     def request_n_frames_processed_up_to_slot(
@@ -83,10 +83,13 @@ class AppAPI:
         return getattr(self._gui, "_flat_stack_n", 20)
 
     def set_acquisition_idle(self) -> None:
-        """Call when your acquisition worker has finished (sets acq_mode idle, clears progress)."""
+        """Call when your acquisition worker has finished (sets acq_mode idle, clears progress).
+        Waits for frames still in the pipeline so the idle transition sees the final integrated frame."""
+        self._gui.wait_pipeline_idle()
         self._gui.acq_mode = "idle"
         self._gui._progress = 0.0
         self._gui._progress_text = ""
+        self._gui._acq_idle_event.set()
 
     def set_acquisition_thread(self, thread: Any) -> None:
         """Set the current acquisition thread (so app can join on exit)."""
@@ -126,11 +129,13 @@ class AppAPI:
         """Set dark reference (e.g. after dark capture). Use from worker with frame_lock."""
         with self._gui.frame_lock:
             self._gui.dark_field = arr
+        self._gui._dark_flat_status_dirty = True
 
     def set_flat_field(self, arr: np.ndarray) -> None:
         """Set flat reference (e.g. after flat capture). Use from worker with frame_lock."""
         with self._gui.frame_lock:
             self._gui.flat_field = arr
+        self._gui._dark_flat_status_dirty = True
 
     def save_dark_field(self) -> None:
         """Persist current dark to disk (call after set_dark_field)."""
@@ -350,8 +355,9 @@ class AppAPI:
     # ─── Display (manual alteration, e.g. deconvolution) ────────────────────
 
     def get_current_display_frame(self) -> Optional[np.ndarray]:
-        """Current frame shown in the display (for Apply to frame)."""
-        return self._gui._get_current_display_frame()
+        """Current frame shown in the display (for Apply to frame). Returns a copy the module may modify."""
+        frame = self._gui._get_current_display_frame()
+        return frame.copy() if frame is not None else None
 
     def paint_frame_to_display(self, frame: np.ndarray) -> None:
         """Paint a frame to the texture (e.g. after deconvolution)."""
@@ -365,8 +371,9 @@ class AppAPI:
         New frames will not overwrite the preview until clear_main_view_preview() is called.
         Safe to call from a worker thread: the paint is deferred to the main thread.
         """
+        pending = np.asarray(frame, dtype=np.float32).copy()  # copy outside frame_lock
         with self._gui.frame_lock:
-            self._gui._pending_preview_frame = np.asarray(frame, dtype=np.float32).copy()
+            self._gui._pending_preview_frame = pending
             self._gui._pending_preview_use_histogram = use_histogram
 
     def clear_main_view_preview(self) -> None:
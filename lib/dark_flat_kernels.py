@@ -0,0 +1,103 @@
+"""
+Per-pixel dark/flat correction kernels used by the dark_correction and flat_correction modules.
+Each kernel makes a single pass over the frame and writes into one output array, instead of
+chaining NumPy expressions that each allocate a full-frame temporary.
+numba is optional: without it the same arithmetic runs as in-place NumPy operations.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; NumPy fallbacks below are used without it
+    njit = None
+
+FLAT_OUT_MAX = 1e4  # upper clip after flat correction (display-safe range)
+
+
+if njit is not None:
+    try:
+        # Explicit signatures: compiled at import (cached in __pycache__), no JIT latency on the first frame.
+        @njit("void(f4[:, ::1], f4[:, ::1], f4, f4, f4, f4[:, ::1])", parallel=True, cache=True)
+        def _subtract_dark_jit(frame, dark, f_min, scale, d_min, out):
+            h, w = frame.shape
+            for y in prange(h):
+                for x in range(w):
+                    out[y, x] = (frame[y, x] - f_min) * scale + d_min - dark[y, x]
+
+        @njit("void(f4[:, ::1], f4[:, ::1], f4, f4[:, ::1])", parallel=True, cache=True)
+        def _apply_flat_gain_jit(frame, gain, out_max, out):
+            h, w = frame.shape
+            for y in prange(h):
+                for x in range(w):
+                    v = frame[y, x] * gain[y, x]
+                    if not np.isfinite(v):
+                        v = 0.0
+                    elif v < 0.0:
+                        v = 0.0
+                    elif v > out_max:
+                        v = out_max
+                    out[y, x] = v
+    except Exception as e:  # e.g. a stale or foreign numba cache: fall back to NumPy, don't fail the import
+        print(f"[{__name__}] numba kernels unavailable, using NumPy: {e!r}", flush=True)
+        njit = None
+if njit is None:
+    _subtract_dark_jit = None
+    _apply_flat_gain_jit = None
+
+
+def subtract_dark(
+    frame: np.ndarray,
+    dark: np.ndarray,
+    f_min: float = 0.0,
+    scale: float = 1.0,
+    d_min: float = 0.0,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Return (frame - f_min) * scale + d_min - dark as float32 (H, W).
+    Defaults give a plain frame - dark; the scale terms map the frame into the dark's value range.
+    """
+    frame = np.ascontiguousarray(frame, dtype=np.float32)
+    dark = np.ascontiguousarray(dark, dtype=np.float32)
+    if out is None:
+        out = np.empty_like(frame)
+    if _subtract_dark_jit is not None and frame.flags.writeable and dark.flags.writeable:
+        _subtract_dark_jit(frame, dark, np.float32(f_min), np.float32(scale), np.float32(d_min), out)
+        return out
+    if scale != 1.0 or f_min != 0.0 or d_min != 0.0:
+        np.subtract(frame, np.float32(f_min), out=out)
+        np.multiply(out, np.float32(scale), out=out)
+        np.add(out, np.float32(d_min), out=out)
+        np.subtract(out, dark, out=out)
+    else:
+        np.subtract(frame, dark, out=out)
+    return out
+
+
+def flat_gain(flat: np.ndarray) -> np.ndarray:
+    """
+    Per-pixel gain for flat correction: reciprocal of the mean-normalized flat (divisor floored at 1e-10),
+    so frame * gain == frame / (flat / mean(flat)). Compute once per flat, not per frame.
+    """
+    flat = np.asarray(flat, dtype=np.float32)
+    mean_flat = float(np.mean(flat))
+    if not np.isfinite(mean_flat) or mean_flat <= 0:
+        mean_flat = 1e-10
+    divisor = flat / np.float32(mean_flat)
+    divisor = np.where(divisor > 1e-10, divisor, np.float32(1e-10))
+    return np.ascontiguousarray(np.float32(1.0) / divisor, dtype=np.float32)
+
+
+def apply_flat_gain(frame: np.ndarray, gain: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Return frame * gain as float32 (H, W) with non-finite values set to 0 and clipped to [0, FLAT_OUT_MAX]."""
+    frame = np.ascontiguousarray(frame, dtype=np.float32)
+    if out is None:
+        out = np.empty_like(frame)
+    if _apply_flat_gain_jit is not None and frame.flags.writeable:
+        _apply_flat_gain_jit(frame, gain, np.float32(FLAT_OUT_MAX), out)
+        return out
+    np.multiply(frame, gain, out=out)
+    np.nan_to_num(out, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    np.clip(out, 0.0, FLAT_OUT_MAX, out=out)
+    return out
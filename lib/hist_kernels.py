@@ -0,0 +1,57 @@
+"""
+Histogram kernel for display statistics (auto-window percentiles).
+unit_histogram quantizes and counts in one pass over the pixels; with numba the pass runs in parallel
+chunks (each with its own bin array, summed at the end) and releases the GIL, so the UI thread is not
+blocked on a single-threaded bincount. numba is optional: the NumPy fallback quantizes then bincounts.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; NumPy fallback below is used without it
+    njit = None
+
+HIST_CHUNKS = max(1, min(16, os.cpu_count() or 1))  # per-chunk bin arrays reduced after the parallel pass
+
+
+if njit is not None:
+    try:
+        # Explicit signature: compiled at import (cached in __pycache__), no JIT latency on the first call.
+        @njit("void(f4[::1], f8, f8, i8[:, ::1])", parallel=True, nogil=True, cache=True)
+        def _unit_histogram_jit(flat, lo, scale, counts):
+            n_chunks, nbins = counts.shape
+            n = flat.size
+            step = (n + n_chunks - 1) // n_chunks
+            for c in prange(n_chunks):
+                end = min(n, (c + 1) * step)
+                for i in range(c * step, end):
+                    k = int((flat[i] - lo) * scale)
+                    if k < 0:
+                        k = 0
+                    elif k >= nbins:
+                        k = nbins - 1
+                    counts[c, k] += 1
+    except Exception as e:  # e.g. a stale or foreign numba cache: fall back to NumPy, don't fail the import
+        print(f"[{__name__}] numba kernels unavailable, using NumPy: {e!r}", flush=True)
+        njit = None
+if njit is None:
+    _unit_histogram_jit = None
+
+
+def unit_histogram(flat: np.ndarray, lo: float, scale: float, nbins: int) -> np.ndarray:
+    """
+    Counts (int64, nbins) of int((flat - lo) * scale) clipped to [0, nbins - 1].
+    flat must be finite (the histogram analysis pixels are); nbins <= 65536.
+    """
+    flat = np.ascontiguousarray(flat, dtype=np.float32).reshape(-1)
+    if _unit_histogram_jit is not None and flat.flags.writeable:
+        counts = np.zeros((HIST_CHUNKS, nbins), dtype=np.int64)
+        _unit_histogram_jit(flat, float(lo), float(scale), counts)
+        return counts.sum(axis=0)
+    idx = np.subtract(flat, np.float32(lo), dtype=np.float32)
+    np.multiply(idx, np.float32(scale), out=idx)
+    np.clip(idx, 0, nbins - 1, out=idx)
+    return np.bincount(idx.astype(np.uint16), minlength=nbins)
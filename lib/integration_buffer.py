@@ -0,0 +1,173 @@
+"""
+Integration buffer: the last N processed frames plus their running sum.
+
+Each new frame updates the sum as sum += new - evicted, so the integrated (mean) frame costs
+one pass over the pixels per frame instead of re-averaging all N frames every time.
+RunningMean is the append-only variant used to stack dark/flat captures.
+"""
+
+import threading
+
+import numpy as np
+
+
+class IntegrationBuffer:
+    """
+    Ring of the last N frames (preallocated (N, H, W) array) and their float64 running sum.
+    Frames are stored as float32, or float16 via set_storage_dtype (half the memory). float16 has an
+    11-bit significand: integer values are exact only up to 2048 and quantize to 2 DN steps from 2048
+    to 4096 (coarser above); values are clipped to the float16 range.
+
+    push() and mean() run on the pipeline worker, clear() on the main thread. They serialize on the
+    buffer's own lock, so gui.frame_lock (which the UI takes) is never held while frames are summed.
+    mean() returns a new array each time: display frames are handed off by reference, never rewritten.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._dtype = np.dtype(np.float32)
+        self._ring = None   # (capacity, H, W) storage dtype
+        self._sum = None    # (H, W) float64 running sum of the frames in the ring
+        self._head = 0      # next slot to write
+        self._count = 0     # frames currently in the ring
+        self._nonfinite = None  # (capacity,) bool: slot holds NaN/inf (its eviction rebuilds the sum)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        """Drop all frames (next push starts a new integration). Keeps the ring storage for reuse."""
+        with self._lock:
+            if self._sum is not None:
+                self._sum.fill(0.0)
+                self._nonfinite.fill(False)
+            self._head = 0
+            self._count = 0
+
+    def set_storage_dtype(self, dtype) -> None:
+        """Store frames as float32 or float16 (drops buffered frames)."""
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported integration storage dtype: {dtype}")
+        with self._lock:
+            self._dtype = dtype
+            self._ring = None
+            self._sum = None
+            self._head = 0
+            self._count = 0
+
+    def push(self, frame: np.ndarray, n: int) -> None:
+        """Add a frame, keeping at most the last n. A new frame shape starts a new integration."""
+        frame = np.asarray(frame)
+        n = max(1, int(n))
+        with self._lock:
+            self._push(frame, n)
+
+    def _push(self, frame: np.ndarray, n: int) -> None:
+        if self._ring is None or self._ring.shape[1:] != frame.shape:
+            self._allocate(n, frame.shape)
+        elif self._ring.shape[0] != n:
+            self._resize(n)
+        slot = self._ring[self._head]
+        # NaN/inf cannot be subtracted back out (NaN - NaN, inf - inf are NaN): evicting such a frame
+        # rebuilds the sum from the ring instead, so the mean recovers once the bad frame leaves the window
+        rebuild = False
+        if self._count == self._ring.shape[0]:
+            if self._nonfinite[self._head]:
+                rebuild = True
+            else:
+                np.subtract(self._sum, slot, out=self._sum)  # evict the oldest frame
+        else:
+            self._count += 1
+        if self._dtype == np.float16:
+            f16 = np.finfo(np.float16)
+            np.clip(frame, f16.min, f16.max, out=slot, casting="unsafe")  # no overflow to inf in the sum
+        else:
+            np.copyto(slot, frame, casting="unsafe")  # converts straight into the ring (no float32 temporary)
+        # Integer frames are always finite; float frames are checked with one float64 reduction (no temporary)
+        self._nonfinite[self._head] = frame.dtype.kind == "f" and not np.isfinite(slot.sum(dtype=np.float64))
+        if rebuild:
+            self._sum.fill(0.0)
+            for i in range(self._count):
+                np.add(self._sum, self._ring[i], out=self._sum)
+        else:
+            np.add(self._sum, slot, out=self._sum)
+        self._head = (self._head + 1) % self._ring.shape[0]
+
+    def mean(self):
+        """Mean of the buffered frames as float32 (H, W), or None when empty."""
+        with self._lock:
+            if self._sum is None or self._count == 0:
+                return None
+            out = np.empty(self._sum.shape, dtype=np.float32)
+            np.multiply(self._sum, 1.0 / self._count, out=out, casting="same_kind")
+            return out
+
+    def _allocate(self, n: int, shape: tuple) -> None:
+        self._ring = np.empty((n,) + tuple(shape), dtype=self._dtype)
+        self._sum = np.zeros(shape, dtype=np.float64)
+        self._nonfinite = np.zeros(n, dtype=bool)
+        self._head = 0
+        self._count = 0
+
+    def _resize(self, n: int) -> None:
+        """Change capacity to n, keeping the most recent frames (integration_n changed)."""
+        cap = self._ring.shape[0]
+        keep = min(self._count, n)
+        # Oldest-to-newest order of the frames we keep
+        order = [(self._head - keep + i) % cap for i in range(keep)]
+        ring = np.empty((n,) + self._ring.shape[1:], dtype=self._dtype)
+        np.take(self._ring, order, axis=0, out=ring[:keep])
+        nonfinite = np.zeros(n, dtype=bool)
+        nonfinite[:keep] = self._nonfinite[order]
+        self._nonfinite = nonfinite
+        if keep < self._count:
+            # Dropped frames: rebuild the sum from the kept ones (subtracting would accumulate rounding)
+            running_sum = np.zeros(self._sum.shape, dtype=np.float64)
+            for i in range(keep):
+                np.add(running_sum, ring[i], out=running_sum)
+            self._sum = running_sum
+        self._ring = ring
+        self._count = keep
+        self._head = keep % n
+
+
+class RunningMean:
+    """
+    Float64 running sum and count of frames, for dark/flat capture stacking: memory stays one frame
+    no matter how many frames are stacked, and the mean is available after every frame (preview).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sum = None    # (H, W) float64
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        """Drop all frames, keeping the sum array for the next stack of the same shape."""
+        with self._lock:
+            if self._sum is not None:
+                self._sum.fill(0.0)
+            self._count = 0
+
+    def push(self, frame: np.ndarray) -> None:
+        """Add a frame. A new frame shape restarts the stack."""
+        frame = np.asarray(frame)
+        with self._lock:
+            if self._sum is None or self._sum.shape != frame.shape:
+                self._sum = np.zeros(frame.shape, dtype=np.float64)
+                self._count = 0
+            np.add(self._sum, frame, out=self._sum)
+            self._count += 1
+
+    def mean(self):
+        """Mean of the pushed frames as float32 (H, W), or None when empty."""
+        with self._lock:
+            if self._sum is None or self._count == 0:
+                return None
+            out = np.empty(self._sum.shape, dtype=np.float32)
+            np.multiply(self._sum, 1.0 / self._count, out=out, casting="same_kind")
+            return out
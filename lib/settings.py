@@ -9,6 +9,7 @@ Only core app defaults are defined here.
 """
 
 import json
+import os
 import pathlib
 import re
 
@@ -26,6 +27,7 @@ CORE_DEFAULTS = {
     "win_max": 4095.0,
     "hist_eq": False,
     "disp_scale": 1,  # 1=full res, 2=half, 4=quarter (display only; applies on next startup)
+    "integration_float16": False,  # store integration ring frames as float16 (half RAM; exact to 2048, 2 DN steps above)
     "current_profile": "",  # last loaded or saved profile name (for Settings UI)
     "last_file_dialog_dir": "",  # last folder used for open/save; empty => use app/captures
 }
@@ -34,6 +36,10 @@ CORE_DEFAULTS = {
 # This is set by get_all_defaults() on first call
 _DEFAULTS_CACHE = None
 
+# settings.json as last read or written: (st_mtime_ns, st_size, dict). Debounced saves merge into this
+# instead of re-reading and re-parsing the file each time; an external edit changes the stat and is re-read.
+_SETTINGS_FILE_CACHE = None
+
 
 def get_all_defaults(modules=None) -> dict:
     """
@@ -58,6 +64,38 @@ def get_all_defaults(modules=None) -> dict:
     return defaults
 
 
+def _write_json(path: pathlib.Path, data: dict) -> None:
+    """
+    Serialize data in memory and write it with one call to a temp file next to path, then swap it in
+    with os.replace, so a crash mid-save never leaves a truncated settings/profile file.
+    """
+    global _SETTINGS_FILE_CACHE
+    payload = json.dumps(data, indent=2).encode("utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    if path == SETTINGS_FILE:
+        st = path.stat()
+        _SETTINGS_FILE_CACHE = (st.st_mtime_ns, st.st_size, dict(data))
+
+
+def _read_settings_file() -> dict:
+    """Parsed settings.json (a new dict; empty if the file is missing). Not re-parsed while the file is unchanged."""
+    global _SETTINGS_FILE_CACHE
+    try:
+        st = SETTINGS_FILE.stat()
+    except FileNotFoundError:
+        return {}
+    cache = _SETTINGS_FILE_CACHE
+    if cache is not None and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+        return dict(cache[2])
+    with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _SETTINGS_FILE_CACHE = (st.st_mtime_ns, st.st_size, data)
+    return dict(data)
+
+
 def load_settings(extra_keys=None) -> dict:
     """Load settings from disk. Returns dict with defaults plus any extra_keys from file."""
     defaults = get_all_defaults()
@@ -65,8 +103,7 @@ def load_settings(extra_keys=None) -> dict:
     if not SETTINGS_FILE.exists():
         return out
     try:
-        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _read_settings_file()
         for k in defaults:
             if k in data:
                 out[k] = data[k]
@@ -86,19 +123,15 @@ def save_settings(settings_dict: dict, extra_keys=None) -> None:
     if extra_keys:
         allowed |= set(extra_keys)
     try:
-        existing = {}
-        if SETTINGS_FILE.exists():
-            try:
-                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-            except Exception:
-                pass
+        try:
+            existing = _read_settings_file()
+        except Exception:
+            existing = {}
         for k in allowed:
             if k in settings_dict:
                 existing[k] = settings_dict[k]
         to_write = {k: existing[k] for k in allowed if k in existing}
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(to_write, f, indent=2)
+        _write_json(SETTINGS_FILE, to_write)
     except Exception:
         pass
 
@@ -132,9 +165,7 @@ def save_profile(profile_name: str, settings_dict: dict, extra_keys=None) -> Non
         allowed |= set(extra_keys)
     to_write = {k: settings_dict[k] for k in allowed if k in settings_dict}
     PROFILES_DIR.mkdir(parents=True, exist_ok=True)
-    path = _profile_filename(profile_name)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(to_write, f, indent=2)
+    _write_json(_profile_filename(profile_name), to_write)
 
 
 def load_profile(profile_name: str, extra_keys=None) -> dict:
@@ -165,19 +196,14 @@ def apply_profile(profile_name: str, extra_keys=None) -> None:
         allowed |= set(extra_keys)
     to_write = {k: data[k] for k in allowed if k in data}
     to_write["current_profile"] = profile_name
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(to_write, f, indent=2)
+    _write_json(SETTINGS_FILE, to_write)
 
 
 def set_current_profile(profile_name: str) -> None:
     """Update current_profile in settings.json (e.g. after saving a profile)."""
     try:
-        existing = {}
-        if SETTINGS_FILE.exists():
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                existing = json.load(f)
+        existing = _read_settings_file()
         existing["current_profile"] = profile_name
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(existing, f, indent=2)
+        _write_json(SETTINGS_FILE, existing)
     except Exception:
         pass
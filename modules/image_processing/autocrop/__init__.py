@@ -75,6 +75,12 @@ def process_frame(frame, gui):
     return api.outgoing_frame(MODULE_NAME, out)
 
 
+def get_params_key(gui):
+    """Everything process_frame's output depends on besides the frame (auto-apply, crop rectangle); lets the preview reuse its last output."""
+    api = gui.api
+    return (api.alteration_auto_apply(gui, "autocrop_auto_apply", default=True),) + tuple(api.get_crop_region())
+
+
 def build_ui(gui, parent_tag: str = "control_panel") -> None:
     """Build Autocrop collapsing header; callbacks live in this module (no gui.py changes)."""
     import dearpygui.dearpygui as dpg
@@ -8,7 +8,7 @@ Runs at pipeline slot 250 (after flat, before banding).
 import numpy as np
 from pathlib import Path
 
-from .bad_pixel_correction import replace_bad_pixels
+from .bad_pixel_correction import prepare_bad_pixel_gather, replace_bad_pixels
 
 MODULE_INFO = {
     "display_name": "Bad pixel map",
@@ -176,6 +176,16 @@ def _save_map(api, mask: np.ndarray) -> None:
             pass
 
 
+def _bad_pixel_gather(gui, mask: np.ndarray):
+    """Neighbor gather for mask, cached on gui until the mask object is replaced (build/load/clear)."""
+    cached = getattr(gui, "_bad_pixel_gather_cache", None)
+    if cached is not None and cached[0] is mask:
+        return cached[1]
+    gather = prepare_bad_pixel_gather(mask)
+    gui._bad_pixel_gather_cache = (mask, gather)
+    return gather
+
+
 def process_frame(frame: np.ndarray, gui) -> np.ndarray:
     """Replace bad pixels (from loaded map) with median of 3×3 good neighbors when auto correct is on."""
     api = gui.api
@@ -185,7 +195,7 @@ def process_frame(frame: np.ndarray, gui) -> np.ndarray:
     mask = getattr(gui, "bad_pixel_map_mask", None)
     if mask is None or mask.shape != frame.shape:
         return api.outgoing_frame(MODULE_NAME, frame)
-    out = replace_bad_pixels(np.asarray(frame, dtype=np.float32), mask)
+    out = replace_bad_pixels(np.asarray(frame, dtype=np.float32), mask, _bad_pixel_gather(gui, mask))
     return api.outgoing_frame(MODULE_NAME, out)
 
 
@@ -256,7 +266,7 @@ def build_ui(gui, parent_tag: str = "control_panel") -> None:
             g.api.set_status_message("Map resolution does not match frame.")
             return
         g._bad_pixel_map_raw_frame = raw.copy()
-        corrected = replace_bad_pixels(np.asarray(raw, dtype=np.float32), mask)
+        corrected = replace_bad_pixels(np.asarray(raw, dtype=np.float32), mask, _bad_pixel_gather(g, mask))
         g.api.output_manual_from_module(MODULE_NAME, corrected)
         g.api.set_status_message("Bad pixel correction applied to current frame.")
 
@@ -275,8 +285,8 @@ def build_ui(gui, parent_tag: str = "control_panel") -> None:
             return
         flat_t = float(dpg.get_value("bad_pixel_map_flat_thresh"))
         dark_t = float(dpg.get_value("bad_pixel_map_dark_thresh"))
-        with api.get_frame_lock():
-            mask = _build_mask_from_dark_flat(dark, flat, flat_t, dark_t)
+        # dark/flat are replaced (never modified) on capture/load, so the local references need no lock
+        mask = _build_mask_from_dark_flat(dark, flat, flat_t, dark_t)
         if mask is None:
             api.set_status_message("Could not build bad pixel map.")
             return
@@ -5,8 +5,38 @@ Used by the bad_pixel_map alteration module.
 
 import numpy as np
 
+_NEIGHBOR_OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)]
 
-def replace_bad_pixels(frame: np.ndarray, mask: np.ndarray) -> np.ndarray:
+
+def prepare_bad_pixel_gather(mask: np.ndarray):
+    """
+    Precompute the gather for replace_bad_pixels (once per mask, not per frame).
+
+    Returns:
+        (bad_idx, neighbor_idx, n_good): flat indices of the K bad pixels that have at least one good
+        neighbor, (K, 8) flat indices of their neighbors with the good ones first (unused slots repeat
+        index 0 and are ignored), and (K,) the number of good neighbors.
+    """
+    h, w = mask.shape
+    bad_ys, bad_xs = np.nonzero(mask)
+    nbr = np.zeros((bad_ys.size, len(_NEIGHBOR_OFFSETS)), dtype=np.intp)
+    good = np.zeros(nbr.shape, dtype=bool)
+    for j, (dy, dx) in enumerate(_NEIGHBOR_OFFSETS):
+        ny, nx = bad_ys + dy, bad_xs + dx
+        inside = (ny >= 0) & (ny < h) & (nx >= 0) & (nx < w)
+        ny, nx = np.where(inside, ny, 0), np.where(inside, nx, 0)
+        good[:, j] = inside & ~mask[ny, nx]
+        nbr[:, j] = ny * w + nx
+    # Stable sort puts the good neighbors first in each row
+    order = np.argsort(~good, axis=1, kind="stable")
+    nbr = np.take_along_axis(nbr, order, axis=1)
+    n_good = good.sum(axis=1)
+    keep = n_good > 0  # no good neighbors: pixel is left as is
+    bad_idx = (bad_ys * w + bad_xs)[keep]
+    return bad_idx, nbr[keep], n_good[keep]
+
+
+def replace_bad_pixels(frame: np.ndarray, mask: np.ndarray, gather=None) -> np.ndarray:
     """
     Replace every pixel where mask is True with the median of valid (non-bad) pixels
     in its 3×3 neighborhood. Edge pixels use whatever neighbors exist.
@@ -14,6 +44,7 @@ def replace_bad_pixels(frame: np.ndarray, mask: np.ndarray) -> np.ndarray:
     Args:
         frame: (H, W) float32 image.
         mask: (H, W) bool, True = bad pixel.
+        gather: Optional prepare_bad_pixel_gather(mask) result, so repeated frames skip the setup.
 
     Returns:
         (H, W) float32 with bad pixels replaced (same shape as frame).
@@ -22,39 +53,17 @@ def replace_bad_pixels(frame: np.ndarray, mask: np.ndarray) -> np.ndarray:
         return frame
     if frame.shape != mask.shape:
         return frame
-    out = np.asarray(frame, dtype=np.float32).copy()
-    h, w = frame.shape
-    for dy in range(-1, 2):
-        for dx in range(-1, 2):
-            if dx == 0 and dy == 0:
-                continue
-            # Shifted views: neighbor at (y+dy, x+dx) is at (y, x) in the shifted frame
-            y0, y1 = max(0, dy), min(h, h + dy)
-            x0, x1 = max(0, dx), min(w, w + dx)
-            if y0 >= y1 or x0 >= x1:
-                continue
-            # This neighbor's view
-            ny0, ny1 = max(0, -dy), min(h, h - dy)
-            nx0, nx1 = max(0, -dx), min(w, w - dx)
-            # Only at bad pixel locations we want to collect neighbor values
-            bad_here = mask[y0:y1, x0:x1]
-            neighbor_vals = frame[ny0:ny1, nx0:nx1]
-            good_neighbor = ~mask[ny0:ny1, nx0:nx1]
-            # We'll accumulate: for each bad pixel, we need median of good neighbors.
-            # Doing it with a loop over (dy,dx) is tricky. Simpler: one pass per pixel.
-    # Per-pixel median of good neighbors (simpler, still vectorized where possible)
-    bad_ys, bad_xs = np.where(mask)
-    for i in range(len(bad_ys)):
-        y, x = bad_ys[i], bad_xs[i]
-        vals = []
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                if dx == 0 and dy == 0:
-                    continue
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < h and 0 <= nx < w and not mask[ny, nx]:
-                    vals.append(frame[ny, nx])
-        if vals:
-            out[y, x] = float(np.median(vals))
-        # else leave as is (no good neighbors)
+    if gather is None:
+        gather = prepare_bad_pixel_gather(mask)
+    bad_idx, neighbor_idx, n_good = gather
+    out = np.array(frame, dtype=np.float32, order="C")
+    if bad_idx.size == 0:
+        return out
+    # One gather of all neighbors; bad/outside slots become +inf so they sort after the good values
+    vals = frame.reshape(-1)[neighbor_idx].astype(np.float64)
+    vals[np.arange(vals.shape[1]) >= n_good[:, np.newaxis]] = np.inf
+    vals.sort(axis=1)
+    lo = np.take_along_axis(vals, ((n_good - 1) // 2)[:, np.newaxis], axis=1)[:, 0]
+    hi = np.take_along_axis(vals, (n_good // 2)[:, np.newaxis], axis=1)[:, 0]
+    out.reshape(-1)[bad_idx] = (lo + hi) * 0.5
     return out
@@ -86,8 +86,11 @@ def get_settings_for_save(gui=None):
     return out
 
 
-def _apply_banding(frame: np.ndarray, gui) -> np.ndarray:
-    """Apply horizontal and/or vertical banding correction. Used by pipeline and by manual Apply."""
+def _apply_banding(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
+    """
+    Apply horizontal and/or vertical banding correction. Used by pipeline and by manual Apply.
+    out: optional float32 buffer for the result; the second pass then runs in place on it.
+    """
     api = gui.api
     vert_first = api.get_vertical_banding_first()
     if vert_first:
@@ -99,6 +102,7 @@ def _apply_banding(frame: np.ndarray, gui) -> np.ndarray:
                 frame,
                 stripe_h=api.get_vertical_stripe_h(),
                 smooth_win=v_smooth_win,
+                out=out,
             )
         if api.get_banding_enabled():
             smooth_win = api.get_banding_smooth_win()
@@ -109,6 +113,7 @@ def _apply_banding(frame: np.ndarray, gui) -> np.ndarray:
                 black_w=api.get_banding_black_w(),
                 black_offset=0,
                 smooth_win=smooth_win,
+                out=out,
             )
     else:
         if api.get_banding_enabled():
@@ -120,6 +125,7 @@ def _apply_banding(frame: np.ndarray, gui) -> np.ndarray:
                 black_w=api.get_banding_black_w(),
                 black_offset=0,
                 smooth_win=smooth_win,
+                out=out,
             )
         if api.get_vertical_banding_enabled():
             v_smooth_win = api.get_vertical_smooth_win()
@@ -129,14 +135,16 @@ def _apply_banding(frame: np.ndarray, gui) -> np.ndarray:
                 frame,
                 stripe_h=api.get_vertical_stripe_h(),
                 smooth_win=v_smooth_win,
+                out=out,
             )
     return frame
 
 
-def process_frame(frame: np.ndarray, gui) -> np.ndarray:
+def process_frame(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
     """
     Applies horizontal and/or vertical banding correction using app banding state.
     Order: vertical first or horizontal first depending on api.get_vertical_banding_first().
+    The first enabled pass writes into out when given and the second runs in place on it.
     """
     api = gui.api
     frame = api.incoming_frame(MODULE_NAME, frame)
@@ -174,8 +182,8 @@ def process_frame(frame: np.ndarray, gui) -> np.ndarray:
                 )
                 api.set_vertical_banding_optimized_win(win)
                 api.set_status_message(f"Vertical banding: optimized smooth window = {win} (score: {score:.2f})")
-    out = _apply_banding(frame, gui)
-    return api.outgoing_frame(MODULE_NAME, out)
+    result = _apply_banding(frame, gui, out=out)
+    return api.outgoing_frame(MODULE_NAME, result)
 
 
 def build_ui(gui, parent_tag: str = "control_panel") -> None:
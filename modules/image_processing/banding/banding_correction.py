@@ -2,10 +2,17 @@
 Banding correction library for horizontal banding removal using reference pixels.
 
 Separates slow background (scatter/drift) from fast banding component and subtracts only the banding.
+The per-pixel subtraction of the band profile runs as a parallel numba kernel when numba is installed
+(optional; NumPy broadcasting otherwise). The reference medians and smoothing are 1-D and stay in NumPy.
 """
 
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; NumPy fallback in _subtract_band is used without it
+    njit = None
+
 
 # Default configuration (horizontal = right-side reference)
 DEFAULT_BLACK_W = 20        # Width of reference stripe in pixels (use last BLACK_W columns)
@@ -17,21 +24,83 @@ DEFAULT_VERTICAL_STRIPE_H = 20   # Height of reference stripe in pixels (use las
 DEFAULT_VERTICAL_SMOOTH_WIN = 128  # Window size for slow background smoothing in columns
 
 
+if njit is not None:
+    try:
+        # Explicit signatures: compiled at import (cached in __pycache__), no JIT latency on the first frame.
+        @njit("void(f4[:, ::1], f4[::1], f4[:, ::1])", parallel=True, cache=True)
+        def _subtract_row_band_jit(img, band, out):
+            h, w = img.shape
+            for y in prange(h):
+                b = band[y]
+                for x in range(w):
+                    out[y, x] = img[y, x] - b
+
+        @njit("void(f4[:, ::1], f4[::1], f4[:, ::1])", parallel=True, cache=True)
+        def _subtract_col_band_jit(img, band, out):
+            h, w = img.shape
+            for y in prange(h):
+                for x in range(w):
+                    out[y, x] = img[y, x] - band[x]
+    except Exception as e:  # e.g. a stale or foreign numba cache: fall back to NumPy, don't fail the import
+        print(f"[{__name__}] numba kernels unavailable, using NumPy: {e!r}", flush=True)
+        njit = None
+if njit is None:
+    _subtract_row_band_jit = None
+    _subtract_col_band_jit = None
+
+
+def _subtract_band(img: np.ndarray, band: np.ndarray, per_row: bool, out: np.ndarray = None) -> np.ndarray:
+    """
+    img - band (float32 (H, W)), band indexed by row (per_row) or by column. out may be img itself.
+    Uses the numba kernel for C-contiguous writeable arrays, NumPy broadcasting otherwise.
+    """
+    if out is None:
+        out = np.empty_like(img)
+    band = np.ascontiguousarray(band, dtype=np.float32)
+    kernel = _subtract_row_band_jit if per_row else _subtract_col_band_jit
+    if (
+        kernel is not None
+        and img.flags.c_contiguous and img.flags.writeable
+        and out.flags.c_contiguous and out.dtype == np.float32
+    ):
+        kernel(img, band, out)
+        return out
+    return np.subtract(img, band[:, np.newaxis] if per_row else band[np.newaxis, :], out=out)
+
+
+def _edge_padded_cumsum(x: np.ndarray, pad: int) -> np.ndarray:
+    """Cumulative sum (float64, leading 0) of x edge-padded by pad samples on both sides."""
+    xp = np.pad(np.asarray(x, dtype=np.float64), (pad, pad), mode="edge")
+    cs = np.empty(xp.size + 1, dtype=np.float64)
+    cs[0] = 0.0
+    np.cumsum(xp, out=cs[1:])
+    return cs
+
+
+def _box_mean(cs: np.ndarray, n: int, pad: int, win: int) -> np.ndarray:
+    """Length-n moving average of window win from an _edge_padded_cumsum with pad >= win."""
+    start = pad - win // 2
+    return ((cs[start + win : start + win + n] - cs[start : start + n]) / win).astype(np.float32)
+
+
 def moving_average_1d(x: np.ndarray, win: int) -> np.ndarray:
-    """Moving average with edge padding."""
+    """Moving average with edge padding (running sum: O(len(x)) for any window size)."""
     win = int(win)
     if win < 3:
         return x.astype(np.float32)
-    
-    x = x.astype(np.float32)
-    k = np.ones(win, dtype=np.float32) / win
-    
-    pad_left = win // 2
-    pad_right = win - 1 - pad_left  # makes output length exactly len(x)
-    
-    xp = np.pad(x, (pad_left, pad_right), mode="edge")
-    y = np.convolve(xp, k, mode="valid")
-    return y
+    return _box_mean(_edge_padded_cumsum(x, win), len(x), win, win)
+
+
+def _smoothed_profiles(ref: np.ndarray, candidates: list[int]):
+    """Yield (win, moving_average_1d(ref, win)) for each candidate, sharing one cumulative sum."""
+    pad = max(int(w) for w in candidates)
+    cs = _edge_padded_cumsum(ref, pad)
+    for win in candidates:
+        win = int(win)
+        if win < 3:
+            yield win, ref.astype(np.float32)
+        else:
+            yield win, _box_mean(cs, len(ref), pad, win)
 
 
 def optimize_smooth_window(
@@ -71,14 +140,13 @@ def optimize_smooth_window(
     best_window = candidates[0]
     best_score = float('inf')
     
-    for smooth_win in candidates:
+    for smooth_win, ref_slow in _smoothed_profiles(ref, candidates):
         # Calculate banding correction
-        ref_slow = moving_average_1d(ref, smooth_win)
         band = ref - ref_slow
         
-        # Apply correction to reference stripe
-        corrected_stripe = stripe - band[:, np.newaxis]
-        corrected_ref = np.median(corrected_stripe, axis=1)
+        # Median of the corrected reference stripe: band is constant per row and the median is
+        # shift-invariant, so median(stripe - band) == ref - band (no per-candidate stripe pass)
+        corrected_ref = ref - band
         
         # Quality metric: std of corrected reference stripe (lower = more uniform = better)
         score = np.std(corrected_ref)
@@ -124,11 +192,9 @@ def optimize_smooth_window_vertical(
     best_window = candidates[0]
     best_score = float("inf")
 
-    for smooth_win in candidates:
-        ref_slow = moving_average_1d(ref, smooth_win)
+    for smooth_win, ref_slow in _smoothed_profiles(ref, candidates):
         band = ref - ref_slow
-        corrected_stripe = stripe - band[np.newaxis, :]
-        corrected_ref = np.median(corrected_stripe, axis=0)
+        corrected_ref = ref - band  # == median(stripe - band, axis=0): band is constant per column
         score = np.std(corrected_ref)
         if score < best_score:
             best_score = score
@@ -143,6 +209,7 @@ def correct_banding(
     black_offset: int = DEFAULT_BLACK_OFFSET,
     smooth_win: int = DEFAULT_SMOOTH_WIN,
     auto_optimize: bool = False,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """
     Correct horizontal banding by separating slow background from fast banding.
@@ -153,12 +220,13 @@ def correct_banding(
         black_offset: Offset from right edge (default: 0, use rightmost columns)
         smooth_win: Window size for slow background smoothing in rows (default: 128)
         auto_optimize: If True, automatically find best smooth window (slow, use sparingly)
+        out: Optional preallocated float32 (H, W) array for the result of a float32 input (may be img itself)
     
     Returns:
-        Corrected image (H, W) same dtype as input
+        Corrected image (H, W) same dtype as input (out when given for float32 input)
     """
     img_dtype = img.dtype
-    img = img.astype(np.float32)
+    img = np.asarray(img, dtype=np.float32)
     h, w = img.shape
     
     # Auto-optimize smooth window if requested (slow - tests many window sizes)
@@ -175,7 +243,9 @@ def correct_banding(
     ref_slow = moving_average_1d(ref, smooth_win)
     band = ref - ref_slow  # (H,) - fast-varying banding component only
     
-    # Subtract only banding from entire image
+    # Subtract only banding from entire image (band is already computed, so out may alias img)
+    if img_dtype == np.float32:
+        return _subtract_band(img, band, True, out=out)
     corrected = img - band[:, np.newaxis]
     
     # Convert back to original dtype
@@ -191,6 +261,7 @@ def correct_vertical_banding(
     img: np.ndarray,
     stripe_h: int = DEFAULT_VERTICAL_STRIPE_H,
     smooth_win: int = DEFAULT_VERTICAL_SMOOTH_WIN,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """
     Correct vertical banding using bottom rows as reference (same logic as horizontal).
@@ -203,12 +274,13 @@ def correct_vertical_banding(
         img: Input image (H, W) float32 or uint16
         stripe_h: Height of reference stripe in pixels (default: 20, bottom rows)
         smooth_win: Window size for slow background smoothing in columns (default: 128)
+        out: Optional preallocated float32 (H, W) array for the result of a float32 input (may be img itself)
     
     Returns:
-        Corrected image (H, W) same dtype as input
+        Corrected image (H, W) same dtype as input (out when given for float32 input)
     """
     img_dtype = img.dtype
-    img = img.astype(np.float32)
+    img = np.asarray(img, dtype=np.float32)
     h, w = img.shape
     
     if stripe_h <= 0 or stripe_h >= h:
@@ -224,6 +296,8 @@ def correct_vertical_banding(
     band = ref - ref_slow  # (W,) - fast-varying vertical banding
     
     # Subtract banding from entire image (each column)
+    if img_dtype == np.float32:
+        return _subtract_band(img, band, False, out=out)
     corrected = img - band[np.newaxis, :]
     
     if img_dtype == np.uint16:
@@ -6,6 +6,8 @@ Runs at pipeline slot 100 (before flat). Dark data and load/save remain in the m
 
 import numpy as np
 
+from lib.dark_flat_kernels import subtract_dark
+
 MODULE_INFO = {
     "display_name": "Dark correction",
     "description": "Subtract dark field from frames. Applies on next startup.",
@@ -47,34 +49,45 @@ def get_settings_for_save(gui=None):
     return out
 
 
-def _apply_dark(frame: np.ndarray, gui) -> np.ndarray:
+def _apply_dark(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
     """Subtract dark from frame if loaded and shape matches; otherwise return frame unchanged."""
     api = gui.api
     dark = api.get_dark_field()
     if dark is None or dark.shape != frame.shape:
         return np.asarray(frame, dtype=np.float32)
     frame = np.asarray(frame, dtype=np.float32)
-    d_min, d_max = float(dark.min()), float(dark.max())
+    d_min, d_max = _dark_range(gui, dark)
     f_min, f_max = float(frame.min()), float(frame.max())
     f_range = f_max - f_min + 1e-10
     if f_range > 1e-6 and (f_max > 1.5 * d_max or f_max > 5000):
         scale = (d_max - d_min + 1e-6) / f_range
-        frame = (frame - f_min) * scale + d_min
-    return frame - dark
+        return subtract_dark(frame, dark, f_min=f_min, scale=scale, d_min=d_min, out=out)
+    return subtract_dark(frame, dark, out=out)
+
+
+def _dark_range(gui, dark: np.ndarray) -> tuple[float, float]:
+    """(min, max) of the dark field, computed once per dark array rather than every frame."""
+    cached = getattr(gui, "_dark_range_cache", None)
+    if cached is not None and cached[0] is dark:
+        return cached[1], cached[2]
+    d_min, d_max = float(dark.min()), float(dark.max())
+    gui._dark_range_cache = (dark, d_min, d_max)
+    return d_min, d_max
 
 
-def process_frame(frame: np.ndarray, gui) -> np.ndarray:
+def process_frame(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
     """
     Subtract dark field from frame if loaded and shape matches.
     If frame and dark have very different value ranges (e.g. 16-bit TIFF vs 12-bit dark),
     scale frame to dark's range so same-content images subtract to ~0.
+    The difference is written into out when given; without a matching dark, out is left unused.
     """
     api = gui.api
     frame = api.incoming_frame(MODULE_NAME, frame)
     if not api.alteration_auto_apply(gui, "dark_correction_auto_apply", default=True):
         return api.outgoing_frame(MODULE_NAME, frame)
-    out = _apply_dark(frame, gui)
-    return api.outgoing_frame(MODULE_NAME, out)
+    result = _apply_dark(frame, gui, out=out)
+    return api.outgoing_frame(MODULE_NAME, result)
 
 
 def capture_dark(gui) -> bool:
@@ -57,7 +57,7 @@ def get_settings_for_save(gui=None):
     return out
 
 
-def _apply_dead_pixel(frame, gui):
+def _apply_dead_pixel(frame, gui, out=None):
     """Apply dead line correction. Used by pipeline and by manual Apply."""
     api = gui.api
     if not api.dead_pixel_correction_enabled():
@@ -69,17 +69,18 @@ def _apply_dead_pixel(frame, gui):
         frame,
         dead_vertical_lines=vlines,
         dead_horizontal_lines=hlines,
+        out=out,
     )
 
 
-def process_frame(frame, gui):
-    """Per-frame pipeline step."""
+def process_frame(frame, gui, out=None):
+    """Per-frame pipeline step. out: optional preallocated float32 buffer for the result."""
     api = gui.api
     frame = api.incoming_frame(MODULE_NAME, frame)
     if not api.alteration_auto_apply(gui, "dead_pixel_auto_apply", default=True):
         return api.outgoing_frame(MODULE_NAME, frame)
-    out = _apply_dead_pixel(frame, gui)
-    return api.outgoing_frame(MODULE_NAME, out)
+    result = _apply_dead_pixel(frame, gui, out=out)
+    return api.outgoing_frame(MODULE_NAME, result)
 
 
 def build_ui(gui, parent_tag: str = "control_panel") -> None:
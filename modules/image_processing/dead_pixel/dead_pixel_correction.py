@@ -6,22 +6,88 @@ Fills dead horizontal and vertical lines by interpolating from neighboring pixel
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy path in correct_dead_lines is used without it
+    njit = None
+
+
+if njit is not None:
+    try:
+        @njit(cache=True)
+        def _line_is_dead(lines, idx):
+            for i in range(lines.shape[0]):
+                if lines[i] == idx:
+                    return True
+            return False
+
+        # Explicit signature: compiled at import (and cached in __pycache__), so the first frame pays no JIT cost.
+        # Every input dtype is converted to a float32 working copy first, so one specialization covers all callers.
+        @njit("void(f4[:, ::1], i4[::1], i4[::1])", cache=True, fastmath=True)
+        def _fill_dead_lines_jit(img, vlines, hlines):
+            h, w = img.shape
+            for i in range(vlines.shape[0]):
+                col = vlines[i]
+                if col < 0 or col >= w:
+                    continue
+                left = col - 1
+                while left >= 0 and _line_is_dead(vlines, left):
+                    left -= 1
+                right = col + 1
+                while right < w and _line_is_dead(vlines, right):
+                    right += 1
+                if left >= 0 and right < w:
+                    for y in range(h):
+                        img[y, col] = (img[y, left] + img[y, right]) / 2.0
+                elif left >= 0:
+                    for y in range(h):
+                        img[y, col] = img[y, left]
+                elif right < w:
+                    for y in range(h):
+                        img[y, col] = img[y, right]
+            for i in range(hlines.shape[0]):
+                row = hlines[i]
+                if row < 0 or row >= h:
+                    continue
+                top = row - 1
+                while top >= 0 and _line_is_dead(hlines, top):
+                    top -= 1
+                bottom = row + 1
+                while bottom < h and _line_is_dead(hlines, bottom):
+                    bottom += 1
+                if top >= 0 and bottom < h:
+                    for x in range(w):
+                        img[row, x] = (img[top, x] + img[bottom, x]) / 2.0
+                elif top >= 0:
+                    for x in range(w):
+                        img[row, x] = img[top, x]
+                elif bottom < h:
+                    for x in range(w):
+                        img[row, x] = img[bottom, x]
+    except Exception as e:  # e.g. a stale or foreign numba cache: fall back to NumPy, don't fail the import
+        print(f"[{__name__}] numba kernels unavailable, using NumPy: {e!r}", flush=True)
+        njit = None
+if njit is None:
+    _fill_dead_lines_jit = None
+
 
 def correct_dead_lines(
     img: np.ndarray,
     dead_vertical_lines: list[int] = None,
     dead_horizontal_lines: list[int] = None,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """
     Correct dead pixel lines by interpolating from neighbors.
     
     Args:
         img: Input image (H, W) float32 or uint16
-        dead_vertical_lines: List of column indices with dead vertical lines (e.g., [661])
-        dead_horizontal_lines: List of row indices with dead horizontal lines (e.g., [100, 200])
+        dead_vertical_lines: Column indices with dead vertical lines (e.g., [661]); list or int ndarray
+        dead_horizontal_lines: Row indices with dead horizontal lines (e.g., [100, 200]); list or int ndarray
+        out: Optional preallocated (H, W) array to write the result into (e.g. np.empty_like(img))
     
     Returns:
-        Corrected image (H, W) same dtype as input
+        Corrected image (H, W) same dtype as input (out when given)
     """
     if dead_vertical_lines is None:
         dead_vertical_lines = []
@@ -29,12 +95,27 @@ def correct_dead_lines(
         dead_horizontal_lines = []
     
     if len(dead_vertical_lines) == 0 and len(dead_horizontal_lines) == 0:
+        if out is not None:
+            np.copyto(out, img)
+            return out
         return img.copy()
     
     img_dtype = img.dtype
-    corrected = img.astype(np.float32).copy()
+    if out is not None and out.dtype == np.float32 and out.shape == img.shape and out.flags.c_contiguous:
+        np.copyto(out, img, casting="unsafe")  # work directly in the caller's buffer
+        corrected = out
+    else:
+        corrected = img.astype(np.float32)
     h, w = corrected.shape
     
+    if _fill_dead_lines_jit is not None:
+        _fill_dead_lines_jit(
+            corrected,
+            np.ascontiguousarray(dead_vertical_lines, dtype=np.int32),
+            np.ascontiguousarray(dead_horizontal_lines, dtype=np.int32),
+        )
+        return _finish(corrected, img_dtype, out)
+    
     # Fix dead vertical lines (columns) - interpolate from left/right neighbors
     for col in dead_vertical_lines:
         if col < 0 or col >= w:
@@ -93,10 +174,80 @@ def correct_dead_lines(
             corrected[row, :] = corrected[bottom_row, :]
         # else: both out of bounds, leave as is
     
-    # Convert back to original dtype
+    return _finish(corrected, img_dtype, out)
+
+
+def _finish(corrected: np.ndarray, img_dtype, out: np.ndarray = None) -> np.ndarray:
+    """Convert the float32 working copy back to the original dtype (into out when given)."""
     if img_dtype == np.uint16:
-        corrected = np.clip(corrected, 0, 65535).astype(np.uint16)
-    else:
-        corrected = corrected.astype(img_dtype)
+        np.clip(corrected, 0, 65535, out=corrected)
+    if out is not None:
+        if out is not corrected:
+            np.copyto(out, corrected, casting="unsafe")
+        return out
+    return corrected.astype(img_dtype)
+
+
+def _ghost_extent(lines: set, start: int, stop: int, limit: int) -> tuple[int, int]:
+    """Grow [start, stop) so it contains the nearest good neighbor of every dead line inside it."""
+    lo, hi = start, stop
+    for line in lines:
+        if line < start or line >= stop:
+            continue
+        before = line - 1
+        while before >= 0 and before in lines:
+            before -= 1
+        after = line + 1
+        while after < limit and after in lines:
+            after += 1
+        lo = min(lo, max(before, 0))
+        hi = max(hi, min(after + 1, limit))
+    return lo, hi
+
+
+def correct_dead_lines_tile(
+    img: np.ndarray,
+    rows: slice,
+    cols: slice,
+    dead_vertical_lines: list[int] = None,
+    dead_horizontal_lines: list[int] = None,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Correct one tile img[rows, cols] of a larger image without correcting the whole image.
+    
+    Reads the tile plus a ghost border wide enough to reach the nearest good neighbor of each
+    dead line in the tile, so the result equals the same region of correct_dead_lines(img, ...).
+    
+    Args:
+        img: Full input image (H, W); may be a memmap, only the tile and its ghost border are read
+        rows: Row slice of the tile (step 1, bounds within the image)
+        cols: Column slice of the tile (step 1, bounds within the image)
+        dead_vertical_lines: Column indices of dead vertical lines (full-image coordinates)
+        dead_horizontal_lines: Row indices of dead horizontal lines (full-image coordinates)
+        out: Optional preallocated array with the tile's shape to write the result into
+    
+    Returns:
+        Corrected tile, same dtype as input (out when given)
+    """
+    h, w = img.shape
+    y0, y1, _ = rows.indices(h)
+    x0, x1, _ = cols.indices(w)
+    vset = {int(c) for c in (dead_vertical_lines if dead_vertical_lines is not None else [])}
+    hset = {int(r) for r in (dead_horizontal_lines if dead_horizontal_lines is not None else [])}
     
-    return corrected
+    # Dead rows in the tile read neighbor rows; those rows need their dead columns fixed too,
+    # so the column border covers the dead columns of every row read.
+    ry0, ry1 = _ghost_extent(hset, y0, y1, h)
+    cx0, cx1 = _ghost_extent(vset, x0, x1, w)
+    region = img[ry0:ry1, cx0:cx1]
+    corrected = correct_dead_lines(
+        region,
+        dead_vertical_lines=sorted(c - cx0 for c in vset if cx0 <= c < cx1),
+        dead_horizontal_lines=sorted(r - ry0 for r in hset if ry0 <= r < ry1),
+    )
+    tile = corrected[y0 - ry0:y1 - ry0, x0 - cx0:x1 - cx0]
+    if out is not None:
+        np.copyto(out, tile)
+        return out
+    return tile
@@ -6,6 +6,8 @@ Runs at pipeline slot 200 (after dark). Flat data and load/save remain in the ma
 
 import numpy as np
 
+from lib.dark_flat_kernels import apply_flat_gain, flat_gain
+
 MODULE_INFO = {
     "display_name": "Flat correction",
     "description": "Divide by flat field for vignetting correction. Applies on next startup.",
@@ -47,37 +49,39 @@ def get_settings_for_save(gui=None):
     return out
 
 
-def _apply_flat(frame: np.ndarray, gui) -> np.ndarray:
+def _apply_flat(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
     """Divide frame by flat field (normalized) if loaded; otherwise return frame unchanged."""
     api = gui.api
     flat = api.get_flat_field()
     if flat is None or flat.shape != frame.shape:
         return np.asarray(frame, dtype=np.float32)
-    frame = np.asarray(frame, dtype=np.float32)
-    flat = np.asarray(flat, dtype=np.float32)
-    mean_flat = float(np.mean(flat))
-    if not np.isfinite(mean_flat) or mean_flat <= 0:
-        mean_flat = 1e-10
-    divisor = flat / mean_flat
-    divisor = np.where(divisor > 1e-10, divisor, 1e-10)
-    out = frame / divisor
-    out = np.clip(np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0), 0.0, 1e4).astype(np.float32)
-    return out
+    return apply_flat_gain(frame, _flat_gain(gui, flat), out=out)
+
+
+def _flat_gain(gui, flat: np.ndarray) -> np.ndarray:
+    """Reciprocal normalized flat, computed once per flat array (division becomes a multiply per frame)."""
+    cached = getattr(gui, "_flat_gain_cache", None)
+    if cached is not None and cached[0] is flat:
+        return cached[1]
+    gain = flat_gain(flat)
+    gui._flat_gain_cache = (flat, gain)
+    return gain
 
 
-def process_frame(frame: np.ndarray, gui) -> np.ndarray:
+def process_frame(frame: np.ndarray, gui, out: np.ndarray = None) -> np.ndarray:
     """
     Divide frame by flat field (normalized). The stored flat is always captured with dark
     correction applied (pipeline slot < 200), so it is already in dark-subtracted space.
     The incoming frame is also already dark-subtracted. Use flat as-is for normalization.
     Avoids divide-by-zero and clips to a display-safe range.
+    The corrected frame is written into out when given; without a flat, out is left unused.
     """
     api = gui.api
     frame = api.incoming_frame(MODULE_NAME, frame)
     if not api.alteration_auto_apply(gui, "flat_correction_auto_apply", default=True):
         return api.outgoing_frame(MODULE_NAME, frame)
-    out = _apply_flat(frame, gui)
-    return api.outgoing_frame(MODULE_NAME, out)
+    result = _apply_flat(frame, gui, out=out)
+    return api.outgoing_frame(MODULE_NAME, result)
 
 
 def capture_flat(gui) -> bool:
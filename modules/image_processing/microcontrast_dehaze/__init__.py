@@ -9,12 +9,6 @@ enhancement with:
 
 import numpy as np
 import time
-try:
-    from skimage.restoration import richardson_lucy
-    _DECONV_AVAILABLE = True
-except ImportError:
-    richardson_lucy = None
-    _DECONV_AVAILABLE = False
 
 try:
     from scipy.ndimage import gaussian_filter
@@ -31,11 +25,6 @@ except ImportError:
     _CLAHE_AVAILABLE = False
 
 
-def is_deconv_available() -> bool:
-    """Return True if scikit-image is installed and deconvolution can run."""
-    return _DECONV_AVAILABLE
-
-
 def is_clahe_available() -> bool:
     """Return True if skimage.exposure.equalize_adapthist is available."""
     return _CLAHE_AVAILABLE
@@ -55,6 +44,58 @@ def gaussian_psf_2d(sigma: float, size: int = None) -> np.ndarray:
     return psf.astype(np.float32)
 
 
+def _fft_len(n: int) -> int:
+    """Smallest 2^a * 3^b * 5^c >= n (sizes NumPy's FFT handles fast)."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+# Last ((sigma, image shape), (fft shape, OTF of psf, OTF of mirrored psf)); sigma rarely changes between frames.
+# Replaced in one assignment, so the pipeline worker and a manual deconv on the main thread never see it half-updated.
+_OTF_LAST = None
+
+
+def _psf_otfs(psf: np.ndarray, sigma: float, shape: tuple):
+    global _OTF_LAST
+    key = (float(sigma), tuple(shape))
+    last = _OTF_LAST
+    if last is not None and last[0] == key:
+        return last[1]
+    kh, kw = psf.shape
+    # Padded to the full linear-convolution size, so the FFT product has no wrap-around at the borders
+    fshape = (_fft_len(shape[0] + kh - 1), _fft_len(shape[1] + kw - 1))
+    otfs = (fshape, np.fft.rfft2(psf, s=fshape), np.fft.rfft2(psf[::-1, ::-1], s=fshape))
+    _OTF_LAST = (key, otfs)
+    return otfs
+
+
+def _richardson_lucy_fft(image: np.ndarray, psf: np.ndarray, otfs, num_iter: int) -> np.ndarray:
+    """
+    Richardson-Lucy iterations (same update as skimage.restoration.richardson_lucy, clip=False) with
+    'same'-mode linear convolutions done as products with the precomputed OTFs: two FFT pairs per iteration.
+    """
+    fshape, otf, otf_mirror = otfs
+    h, w = image.shape
+    y0, x0 = (psf.shape[0] - 1) // 2, (psf.shape[1] - 1) // 2
+
+    def convolve_same(a, kernel_otf):
+        full = np.fft.irfft2(np.fft.rfft2(a, s=fshape) * kernel_otf, s=fshape)
+        return full[y0 : y0 + h, x0 : x0 + w]
+
+    estimate = np.full(image.shape, 0.5, dtype=np.float32)
+    eps = 1e-12
+    for _ in range(num_iter):
+        relative_blur = image / (convolve_same(estimate, otf) + eps)
+        estimate *= convolve_same(relative_blur, otf_mirror)
+    return estimate
+
+
 def deconvolve_richardson_lucy(
     img: np.ndarray,
     sigma: float = 1.0,
@@ -64,9 +105,6 @@ def deconvolve_richardson_lucy(
     """
     Deconvolve image using Richardson-Lucy with a Gaussian PSF.
     """
-    if not _DECONV_AVAILABLE:
-        return img.copy()
-
     img = img.astype(np.float32)
     lo, hi = float(np.min(img)), float(np.max(img))
     if hi <= lo:
@@ -76,7 +114,7 @@ def deconvolve_richardson_lucy(
     img_norm = (img - lo) / scale
 
     psf = gaussian_psf_2d(sigma)
-    out = richardson_lucy(img_norm, psf, num_iter=iterations, clip=False)
+    out = _richardson_lucy_fft(img_norm, psf, _psf_otfs(psf, sigma, img_norm.shape), iterations)
 
     out = out * scale + lo
     if clip_output:
@@ -337,7 +375,7 @@ def process_frame(frame: np.ndarray, gui) -> np.ndarray:
     auto_contrast = bool(getattr(gui, "_microcontrast_auto_workflow", False))
     applied_deconv = False
     applied_enhance = False
-    if auto_deconv and is_deconv_available():
+    if auto_deconv:
         sigma = float(getattr(gui, "_microcontrast_deconv_sigma", 1.0))
         iterations = int(getattr(gui, "_microcontrast_deconv_iterations", 10))
         before = out
@@ -352,15 +390,6 @@ def process_frame(frame: np.ndarray, gui) -> np.ndarray:
                 flush=True,
             )
             gui._microcontrast_last_console_token = frame_token
-    elif auto_deconv:
-        # Auto-deconv requested but unavailable: clear derived deconv cache.
-        gui._microcontrast_deconv_frame = None
-        if int(getattr(gui, "_microcontrast_last_console_token", -1)) != frame_token:
-            print(
-                f"[ImageEnhancement] auto-deconv requested but unavailable (token={frame_token})",
-                flush=True,
-            )
-            gui._microcontrast_last_console_token = frame_token
 
     clarity = float(getattr(gui, "_microcontrast_clarity", 0.0))
     dehaze = float(getattr(gui, "_microcontrast_dehaze", 0.0))
@@ -595,9 +624,6 @@ def _apply_manual(gui):
 
 def _apply_deconv_manual(gui):
     api = gui.api
-    if not is_deconv_available():
-        api.set_status_message("Deconvolution unavailable: install scikit-image and scipy")
-        return
     if not _ensure_snapshot(gui):
         api.set_status_message("No frame to enhance")
         return
@@ -637,7 +663,7 @@ def _apply_full_manual(gui):
     out = np.asarray(raw, dtype=np.float32)
     enable_deconv = bool(getattr(gui, "_microcontrast_auto_deconv_workflow", False))
     enable_contrast = bool(getattr(gui, "_microcontrast_auto_workflow", False))
-    if enable_deconv and is_deconv_available():
+    if enable_deconv:
         sigma = float(getattr(gui, "_microcontrast_deconv_sigma", 1.0))
         iterations = int(getattr(gui, "_microcontrast_deconv_iterations", 10))
         out = deconvolve_richardson_lucy(out, sigma=sigma, iterations=iterations)
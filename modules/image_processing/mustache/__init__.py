@@ -96,6 +96,12 @@ def process_frame(frame, gui):
     return api.outgoing_frame(MODULE_NAME, out)
 
 
+def get_params_key(gui):
+    """Everything process_frame's output depends on besides the frame (auto-apply, coefficients and center); lets the preview reuse its last output."""
+    api = gui.api
+    return (api.alteration_auto_apply(gui, "mustache_auto_apply", default=True),) + tuple(api.get_mustache_params())
+
+
 def build_ui(gui, parent_tag: str = "control_panel") -> None:
     """Build Mustache correction collapsing header. Center X/Y: -1 = frame center."""
     import dearpygui.dearpygui as dpg
@@ -91,6 +91,12 @@ def process_frame(frame, gui):
     return api.outgoing_frame(MODULE_NAME, out)
 
 
+def get_params_key(gui):
+    """Everything process_frame's output depends on besides the frame (auto-apply, strength and center); lets the preview reuse its last output."""
+    api = gui.api
+    return (api.alteration_auto_apply(gui, "pincushion_auto_apply", default=True),) + tuple(api.get_pincushion_params())
+
+
 def build_ui(gui, parent_tag: str = "control_panel") -> None:
     """Build Pincushion collapsing header; callbacks in module. Center X/Y saved; -1 = use frame center."""
     import dearpygui.dearpygui as dpg
@@ -47,7 +47,8 @@ def get_module_info(import_path: str) -> dict[str, Any]:
     """
     Import by import_path and return MODULE_INFO (or defaults).
     Returns dict with: display_name, description, type, default_enabled,
-    camera_priority (if detector), pipeline_slot (if image_processing), setting_keys (list).
+    camera_priority (if detector), pipeline_slot (if image_processing), setting_keys (list),
+    module (the imported module object, or None if the import failed).
     """
     name = import_path.split(".")[-1] if "." in import_path else import_path
     defaults = {
@@ -58,9 +59,11 @@ def get_module_info(import_path: str) -> dict[str, Any]:
         "camera_priority": 0,
         "pipeline_slot": 0,
         "setting_keys": [],
+        "module": None,
     }
     try:
         mod = importlib.import_module(import_path)
+        defaults["module"] = mod
         info = getattr(mod, "MODULE_INFO", None)
         if isinstance(info, dict):
             defaults.update(info)
@@ -81,7 +84,7 @@ def discover_modules() -> list[dict[str, Any]]:
     """
     Return list of module info dicts for all discovered packages under modules/<type>/.
     Each dict has: name, import_path, display_name, description, type, default_enabled,
-    camera_priority (if detector), setting_keys.
+    camera_priority (if detector), setting_keys, module.
     """
     result = []
     for name, import_path in _discover_entries():
@@ -92,6 +95,31 @@ def discover_modules() -> list[dict[str, Any]]:
     return result
 
 
+def load_module(m: dict[str, Any]):
+    """Module object for a discovered module dict (imported once at discovery; raises if that import failed)."""
+    mod = m.get("module")
+    if mod is None:
+        mod = importlib.import_module(m["import_path"])
+        m["module"] = mod
+    return mod
+
+
+def modules_by_type(modules: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """
+    Bucket discovered modules by type (every MODULE_INFO type gets a list, possibly empty).
+    detector is sorted by camera_priority (highest first), image_processing by pipeline_slot;
+    the other types keep discovery order.
+    """
+    buckets: dict[str, list[dict[str, Any]]] = {
+        t: [] for t in ("detector", "image_processing", "manual_alteration", "machine", "workflow_automation")
+    }
+    for m in modules:
+        buckets.setdefault(m.get("type", "machine"), []).append(m)
+    buckets["detector"].sort(key=lambda m: m.get("camera_priority", 0), reverse=True)
+    buckets["image_processing"].sort(key=lambda m: m.get("pipeline_slot", 0))
+    return buckets
+
+
 def all_extra_settings_keys(modules: list[dict[str, Any]]) -> set[str]:
     """Return set of all setting keys to persist: load_<name>_module plus each module's setting_keys."""
     keys = set()
@@ -1,22 +1,70 @@
 """
-Build the main application UI: frame size, pipeline, texture, file dialogs, main window, control panel, settings window.
-Single entry point: build_ui(gui). Called from gui._build_ui().
+Build the main application UI: frame size, pipeline, texture, file dialogs, main window, control panel.
+Entry point: build_ui(gui), called from gui._build_ui(). The Settings window is built on first open
+(build_settings_window(gui), from gui._cb_show_settings).
 """
 
+import inspect
+
 import dearpygui.dearpygui as dpg
+import numpy as np
 
-from ui.constants import DEFAULT_FRAME_W, DEFAULT_FRAME_H, INTEGRATION_CHOICES
+from ui.constants import DEFAULT_FRAME_W, DEFAULT_FRAME_H, DISP_SCALE_LABELS, INTEGRATION_CHOICES
 from lib.image_viewport import ImageViewport
+from modules.registry import load_module
+
+# Optional widgets refreshed every render tick (exist only when their section/module was built)
+TICK_ITEM_TAGS = (
+    "dark_status",
+    "flat_status",
+    "dark_correction_status",
+    "flat_correction_status",
+    "deconv_apply_btn",
+    "file_save_tiff_btn",
+    "file_save_raw_tiff_btn",
+)
+
+# Module types whose control-panel sections follow the Dark/Flat Field headers, in panel order
+_PANEL_MODULE_TYPES = ("image_processing", "manual_alteration", "workflow_automation")
+
+
+def _build_module_uis(gui, module_types):
+    """
+    Add the control-panel sections of the enabled modules of each type, in module_types order.
+    A module whose import or build_ui raises is reported once and marked ui_broken (skipped afterwards).
+    """
+    for t in module_types:
+        for m in gui._modules_by_type[t]:
+            if m.get("ui_broken") or not gui._module_enabled.get(m["name"], False):
+                continue
+            try:
+                mod = load_module(m)
+            except Exception as e:  # not only ImportError: a module's import can raise anything
+                print(f"[UI] {m['name']}: import failed: {e!r}", flush=True)
+                m["ui_broken"] = True
+                continue
+            try:
+                mod.build_ui(gui, "control_panel")
+            except Exception as e:
+                print(f"[UI] {m['name']}: build_ui failed: {e!r}", flush=True)
+                m["ui_broken"] = True
+
+
+def _accepts_out(pf) -> bool:
+    """True if process_frame takes an out= keyword (writes its result into a caller-provided buffer)."""
+    try:
+        return "out" in inspect.signature(pf).parameters
+    except (TypeError, ValueError):
+        return False
 
 
 def build_ui(gui):
-    """Build full UI: frame size, alteration pipeline, texture, dialogs, main window with control panel, settings window."""
+    """Build full UI: frame size, alteration pipeline, texture, dialogs, main window with control panel."""
     # Frame size from selected detector module (highest camera_priority among enabled)
-    detector_modules = [m for m in gui._discovered_modules if m.get("type") == "detector" and gui._module_enabled.get(m["name"], False)]
-    detector_modules.sort(key=lambda m: m.get("camera_priority", 0), reverse=True)
+    detector_modules = [m for m in gui._modules_by_type["detector"] if gui._module_enabled.get(m["name"], False)]
     if detector_modules:
         try:
-            cam_mod = __import__(detector_modules[0]["import_path"], fromlist=["get_frame_size"])
+            cam_mod = load_module(detector_modules[0])
             gui.frame_width, gui.frame_height = cam_mod.get_frame_size()
         except Exception:
             gui.frame_width, gui.frame_height = DEFAULT_FRAME_W, DEFAULT_FRAME_H
@@ -28,26 +76,36 @@ def build_ui(gui):
     gui.bad_pixel_map_mask = None
 
     # Build image alteration pipeline (slot, process_frame) and distortion-only sublist for live preview
-    image_processing_modules = [m for m in gui._discovered_modules if m.get("type") == "image_processing" and gui._module_enabled.get(m["name"], False)]
-    image_processing_modules.sort(key=lambda m: m.get("pipeline_slot", 0))
+    image_processing_modules = [m for m in gui._modules_by_type["image_processing"] if gui._module_enabled.get(m["name"], False)]
     gui._alteration_pipeline = []
     gui._pipeline_module_slots = {}
+    gui._pipeline_out_steps = set()
+    gui._pipeline_params_key_fns = {}
+    gui._pipeline_modules = {}
     for m in image_processing_modules:
         try:
-            mod = __import__(m["import_path"], fromlist=["process_frame"])
+            mod = load_module(m)
             pf = getattr(mod, "process_frame", None)
             if callable(pf):
                 slot = m.get("pipeline_slot", 0)
                 name = m["name"]
                 gui._alteration_pipeline.append((slot, name, pf))
+                gui._pipeline_modules[name] = mod
                 gui._pipeline_module_slots[name] = slot
+                if _accepts_out(pf):
+                    gui._pipeline_out_steps.add(name)
+                key_fn = getattr(mod, "get_params_key", None)
+                if callable(key_fn):
+                    gui._pipeline_params_key_fns[name] = key_fn
         except Exception:
             pass
+    # Slots in pipeline order (modules were sorted by slot): bisect gives the step range for a slot bound
+    gui._pipeline_slot_list = [s for s, _n, _pf in gui._alteration_pipeline]
     gui._distortion_crop_pipeline = [(s, n, pf) for s, n, pf in gui._alteration_pipeline if s >= gui.DISTORTION_PREVIEW_SLOT]
 
     gui.api.warn_about_unloaded_options_with_saved_values()
 
-    blank = [0.0] * (gui._disp_w * gui._disp_h * 4)
+    blank = np.zeros(gui._disp_w * gui._disp_h * 4, dtype=np.float32)  # flat RGBA; no per-element Python floats
     with dpg.texture_registry():
         gui._texture_id = dpg.add_dynamic_texture(
             width=gui._disp_w, height=gui._disp_h, default_value=blank
@@ -84,6 +142,11 @@ def build_ui(gui):
         dpg.add_mouse_click_handler(button=dpg.mvMouseButton_Left, callback=gui._cb_mouse_click)
         dpg.add_mouse_drag_handler(button=dpg.mvMouseButton_Left, callback=gui._cb_mouse_drag)
         dpg.add_mouse_release_handler(button=dpg.mvMouseButton_Left, callback=gui._cb_mouse_release)
+        # Any input keeps the render loop at full rate (run() slows it down only when the app is idle)
+        dpg.add_mouse_move_handler(callback=gui._cb_user_input)
+        dpg.add_mouse_down_handler(callback=gui._cb_user_input)
+        dpg.add_mouse_wheel_handler(callback=gui._cb_user_input)
+        dpg.add_key_down_handler(callback=gui._cb_user_input)
 
     with dpg.window(tag="primary"):
         with dpg.menu_bar():
@@ -120,12 +183,13 @@ def build_ui(gui):
 
                     if detector_modules:
                         try:
-                            cam_mod = __import__(detector_modules[0]["import_path"], fromlist=["build_ui"])
+                            cam_mod = load_module(detector_modules[0])
                             cam_mod.build_ui(gui, "control_panel")
                             gui.camera_module_name = detector_modules[0]["name"]
                             gui._load_dark_field()
                             gui._load_flat_field()
-                        except Exception:
+                        except Exception as e:
+                            print(f"[UI] {detector_modules[0]['name']}: build_ui failed: {e!r}", flush=True)
                             gui.camera_module_name = None
                             with dpg.collapsing_header(label="Connection", default_open=True):
                                 with dpg.group(indent=10):
@@ -183,14 +247,7 @@ def build_ui(gui):
                                 dpg.add_button(label="Clear Buffer", callback=gui._cb_clear_buffer, width=115)
                                 dpg.add_button(label="Capture N", callback=gui._cb_capture_n, width=115)
 
-                    for m in gui._discovered_modules:
-                        if m.get("type") != "machine" or not gui._module_enabled.get(m["name"], False):
-                            continue
-                        try:
-                            mod = __import__(m["import_path"], fromlist=["build_ui"])
-                            mod.build_ui(gui, "control_panel")
-                        except Exception:
-                            pass
+                    _build_module_uis(gui, ("machine",))
 
                     if gui._module_enabled.get("dark_correction", False):
                         with dpg.collapsing_header(label="Dark Field", default_open=False):
@@ -218,32 +275,7 @@ def build_ui(gui):
                                     dpg.add_button(label="Clear Flat", callback=gui._cb_clear_flat, width=115)
                                 dpg.add_text(gui._flat_status_text(), tag="flat_status")
 
-                    image_processing_for_ui = [m for m in gui._discovered_modules if m.get("type") == "image_processing" and gui._module_enabled.get(m["name"], False)]
-                    image_processing_for_ui.sort(key=lambda m: m.get("pipeline_slot", 0))
-                    for m in image_processing_for_ui:
-                        try:
-                            mod = __import__(m["import_path"], fromlist=["build_ui"])
-                            mod.build_ui(gui, "control_panel")
-                        except Exception:
-                            pass
-
-                    for m in gui._discovered_modules:
-                        if m.get("type") != "manual_alteration" or not gui._module_enabled.get(m["name"], False):
-                            continue
-                        try:
-                            mod = __import__(m["import_path"], fromlist=["build_ui"])
-                            mod.build_ui(gui, "control_panel")
-                        except Exception:
-                            pass
-
-                    for m in gui._discovered_modules:
-                        if m.get("type") != "workflow_automation" or not gui._module_enabled.get(m["name"], False):
-                            continue
-                        try:
-                            mod = __import__(m["import_path"], fromlist=["build_ui"])
-                            mod.build_ui(gui, "control_panel")
-                        except Exception:
-                            pass
+                    _build_module_uis(gui, _PANEL_MODULE_TYPES)
 
                 # Right bottom: histogram + image controls (non-scrollable, no wheel conflict)
                 with dpg.group(tag="control_bottom_group"):
@@ -296,42 +328,56 @@ def build_ui(gui):
                         max_value=gui._get_display_max_value(), max_clamped=True
                     )
 
-    _disp_scale_labels = {"1": "1 - Full", "2": "2 - Half", "4": "4 - Quarter"}
+    # The UI is built once per startup, so the per-tick existence checks can be resolved here
+    gui._tick_items = {tag for tag in TICK_ITEM_TAGS if dpg.does_item_exist(tag)}
+
+
+# Settings window: module sections in this order, with these headers
+_SETTINGS_TYPE_ORDER = {"detector": 0, "image_processing": 1, "manual_alteration": 2, "machine": 3, "workflow_automation": 4}
+_SETTINGS_TYPE_HEADERS = {
+    "detector": "Detector modules",
+    "image_processing": "Image processing modules",
+    "manual_alteration": "Manual alteration modules",
+    "machine": "Machine modules",
+    "workflow_automation": "Workflow modules",
+}
+
+
+def _settings_module_sort_key(m):
+    t = m.get("type", "machine")
+    order = _SETTINGS_TYPE_ORDER.get(t, 3)
+    if t == "detector":
+        return (order, -m.get("camera_priority", 0))
+    if t == "image_processing" or t == "manual_alteration":
+        return (order, m.get("pipeline_slot", 0))
+    return (order, 0)
+
+
+def build_settings_window(gui):
+    """Build the Settings window (hidden). Called on first open from gui._cb_show_settings, not at startup."""
     with dpg.window(label="Settings", tag="settings_window", show=False, on_close=lambda: gui._flush_pending_settings_save(force=True)):
         dpg.add_combo(
             label="Display scale",
-            items=["1 - Full", "2 - Half", "4 - Quarter"],
-            default_value=_disp_scale_labels.get(str(gui.disp_scale), "1 - Full"),
+            items=list(DISP_SCALE_LABELS.values()),
+            default_value=DISP_SCALE_LABELS.get(str(gui.disp_scale), "1 - Full"),
             tag="disp_scale_combo",
             width=-1,
             callback=gui._cb_disp_scale
         )
         dpg.add_text("Reduces display resolution (block average).", color=[150, 150, 150])
         dpg.add_spacer()
-        _type_order = {"detector": 0, "image_processing": 1, "manual_alteration": 2, "machine": 3, "workflow_automation": 4}
-        _type_headers = {"detector": "Detector modules", "image_processing": "Image processing modules", "manual_alteration": "Manual alteration modules", "machine": "Machine modules", "workflow_automation": "Workflow modules"}
-
-        def _settings_module_sort_key(m):
-            t = m.get("type", "machine")
-            order = _type_order.get(t, 3)
-            if t == "detector":
-                return (order, -m.get("camera_priority", 0))
-            if t == "image_processing" or t == "manual_alteration":
-                return (order, m.get("pipeline_slot", 0))
-            return (order, 0)
-
         _settings_modules = sorted(gui._discovered_modules, key=_settings_module_sort_key)
         _last_type = None
         for m in _settings_modules:
             t = m.get("type", "machine")
             if t != _last_type:
                 _last_type = t
-                header = _type_headers.get(t, "Modules")
+                header = _SETTINGS_TYPE_HEADERS.get(t, "Modules")
                 dpg.add_text(header, color=[200, 200, 200])
                 if t == "detector":
                     detector_mods = [x for x in _settings_modules if x.get("type") == "detector"]
-                    _det_items = ["None"] + [gui._detector_combo_label(x) for x in detector_mods]
-                    _det_enabled = next((gui._detector_combo_label(x) for x in detector_mods if gui._module_enabled.get(x["name"], False)), None)
+                    _det_items = ["None"] + [gui._detector_labels[x["name"]] for x in detector_mods]
+                    _det_enabled = next((gui._detector_labels[x["name"]] for x in detector_mods if gui._module_enabled.get(x["name"], False)), None)
                     dpg.add_combo(
                         label="Detector module",
                         items=_det_items,
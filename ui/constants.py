@@ -3,6 +3,7 @@ GUI constants and path/nearest-match helpers for dark/flat fields.
 Pure helpers: no GUI reference. Used by gui.py and ui.dark_flat.
 """
 
+import os
 import re
 import math
 import pathlib
@@ -23,6 +24,14 @@ CAPTURES_DIR = _APP_DIR / "captures"
 LAST_CAPTURED_DARK_NAME = "last_captured_dark.npy"
 LAST_CAPTURED_FLAT_NAME = "last_captured_flat.npy"
 INTEGRATION_CHOICES = ["0.5 s", "1 s", "2 s", "5 s", "10 s", "15 s", "20 s"]
+# Status-line names for gui.acq_mode values
+ACQ_MODE_NAMES = {
+    "single": "Single Shot", "dual": "Dual Shot",
+    "continuous": "Continuous", "capture_n": "Capture N",
+    "dark": "Dark Capture", "flat": "Flat Capture",
+}
+# Settings "Display scale" combo labels by str(disp_scale)
+DISP_SCALE_LABELS = {"1": "1 - Full", "2": "2 - Half", "4": "4 - Quarter"}
 DARK_STACK_DEFAULT = 20  # default frames for dark/flat stacking (slider 1-50)
 DARK_FLAT_MATCH_THRESHOLD = 1.0  # max distance to auto-apply dark/flat
 HIST_MIN_12BIT = 0.0
@@ -58,13 +67,14 @@ def flat_path(integration_time_seconds: float, gain: int, width: int, height: in
     return flat_dir(camera_name) / f"flat_{integration_time_seconds}_{gain}_{width}x{height}.npy"
 
 
-# Filename patterns: with resolution dark_1.5_100_1920x1080.npy; legacy dark_1.5_100.npy, dark_1.5.npy
-_DARK_FNAME_RE = re.compile(r"^dark_([\d.]+)_(\d+)_(\d+)x(\d+)\.npy$")
-_DARK_LEGACY_RE = re.compile(r"^dark_([\d.]+)_(\d+)\.npy$")
-_DARK_LEGACY_T_RE = re.compile(r"^dark_([\d.]+)\.npy$")
-_FLAT_FNAME_RE = re.compile(r"^flat_([\d.]+)_(\d+)_(\d+)x(\d+)\.npy$")
-_FLAT_LEGACY_RE = re.compile(r"^flat_([\d.]+)_(\d+)\.npy$")
-_FLAT_LEGACY_T_RE = re.compile(r"^flat_([\d.]+)\.npy$")
+# Filename pattern: with resolution dark_1.5_100_1920x1080.npy; legacy dark_1.5_100.npy, dark_1.5.npy.
+# One regex per kind covers all three forms; unmatched optional groups (g, w/h) are None.
+def _cal_fname_re(prefix: str):
+    return re.compile(rf"^{prefix}_(?P<t>[\d.]+)(?:_(?P<g>\d+)(?:_(?P<w>\d+)x(?P<h>\d+))?)?\.npy$")
+
+
+_DARK_FNAME_RE = _cal_fname_re("dark")
+_FLAT_FNAME_RE = _cal_fname_re("flat")
 
 
 def distance_time_gain(t1: float, g1: int, t2: float, g2: int) -> float:
@@ -72,65 +82,87 @@ def distance_time_gain(t1: float, g1: int, t2: float, g2: int) -> float:
     return abs(t1 - t2) + abs(g1 - g2) / 100.0
 
 
-def find_nearest_dark(camera_name, time_seconds: float, gain: int, width: int, height: int):
-    """Return (path, distance, (t, g)) for nearest dark matching resolution, or (None, inf, None)."""
-    def scan_dir(base_path):
-        candidates = []
-        if not base_path.exists():
-            return candidates
-        for p in base_path.glob("dark_*.npy"):
-            m = _DARK_FNAME_RE.match(p.name)
-            if m:
-                tw, gw, w, h = float(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4))
-                if width > 0 and height > 0 and (w != width or h != height):
-                    continue
-                candidates.append((p, (tw, gw)))
-            else:
-                m = _DARK_LEGACY_RE.match(p.name)
-                if m:
-                    t, g = float(m.group(1)), int(m.group(2))
-                    candidates.append((p, (t, g)))
-                else:
-                    m = _DARK_LEGACY_T_RE.match(p.name)
-                    if m:
-                        candidates.append((p, (float(m.group(1)), 0)))
-        return candidates
-    all_c = scan_dir(dark_dir(camera_name)) + scan_dir(DARK_DIR)
+# (base_path, prefix) -> (directory st_mtime_ns, [(path, (t, g), (w, h) or None)])
+_CAL_DIR_CACHE = {}
+
+
+def invalidate_cal_dir_cache() -> None:
+    """Forget cached dark/flat directory listings (call after writing a master)."""
+    _CAL_DIR_CACHE.clear()
+
+
+def _parse_cal_dir(base_path: pathlib.Path, prefix: str, fname_re):
+    """
+    Return [(path, (t, g), (w, h) or None)] for calibration files '<prefix>_*.npy' in base_path.
+    Walks the directory with os.scandir on plain name strings; the regex only runs on names that
+    pass the cheap prefix/suffix check.
+    """
+    head = prefix + "_"
+    parsed = []
+    try:
+        it = os.scandir(base_path)
+    except OSError:
+        return parsed
+    with it:
+        for entry in it:
+            name = entry.name
+            if not (name.startswith(head) and name.endswith(".npy")):
+                continue
+            m = fname_re.match(name)
+            if m is None:
+                continue
+            try:
+                t = float(m.group("t"))
+            except ValueError:  # e.g. "1.2.3"
+                continue
+            g = m.group("g")
+            w = m.group("w")
+            res = (int(w), int(m.group("h"))) if w is not None else None
+            parsed.append((base_path / name, (t, int(g) if g is not None else 0), res))
+    return parsed
+
+
+def _scan_cal_dir(base_path: pathlib.Path, prefix: str, fname_re, width: int, height: int):
+    """
+    Return [(path, (t, g))] for calibration files '<prefix>_*.npy' in base_path.
+    The parsed listing is cached until the directory's mtime changes (file added/removed/renamed),
+    so repeated lookups while changing gain/integration time do no directory or regex work.
+    Files with a resolution that differs from width x height are skipped.
+    """
+    try:
+        mtime_ns = os.stat(base_path).st_mtime_ns
+    except OSError:
+        return []
+    key = (base_path, prefix)
+    cached = _CAL_DIR_CACHE.get(key)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, _parse_cal_dir(base_path, prefix, fname_re))
+        _CAL_DIR_CACHE[key] = cached
+    check_res = width > 0 and height > 0
+    return [
+        (p, tg) for p, tg, res in cached[1]
+        if not (check_res and res is not None and res != (width, height))
+    ]
+
+
+def _find_nearest(candidates, time_seconds: float, gain: int):
     best_path, best_dist, best_tg = None, math.inf, None
-    for p, (t, g) in all_c:
+    for p, (t, g) in candidates:
         d = distance_time_gain(time_seconds, gain, t, g)
         if d < best_dist:
             best_dist, best_path, best_tg = d, p, (t, g)
     return best_path, best_dist, best_tg
 
 
+def find_nearest_dark(camera_name, time_seconds: float, gain: int, width: int, height: int):
+    """Return (path, distance, (t, g)) for nearest dark matching resolution, or (None, inf, None)."""
+    all_c = _scan_cal_dir(dark_dir(camera_name), "dark", _DARK_FNAME_RE, width, height)
+    all_c += _scan_cal_dir(DARK_DIR, "dark", _DARK_FNAME_RE, width, height)
+    return _find_nearest(all_c, time_seconds, gain)
+
+
 def find_nearest_flat(camera_name, time_seconds: float, gain: int, width: int, height: int):
     """Return (path, distance, (t, g)) for nearest flat matching resolution, or (None, inf, None)."""
-    def scan_dir(base_path):
-        candidates = []
-        if not base_path.exists():
-            return candidates
-        for p in base_path.glob("flat_*.npy"):
-            m = _FLAT_FNAME_RE.match(p.name)
-            if m:
-                tw, gw, w, h = float(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4))
-                if width > 0 and height > 0 and (w != width or h != height):
-                    continue
-                candidates.append((p, (tw, gw)))
-            else:
-                m = _FLAT_LEGACY_RE.match(p.name)
-                if m:
-                    t, g = float(m.group(1)), int(m.group(2))
-                    candidates.append((p, (t, g)))
-                else:
-                    m = _FLAT_LEGACY_T_RE.match(p.name)
-                    if m:
-                        candidates.append((p, (float(m.group(1)), 0)))
-        return candidates
-    all_c = scan_dir(flat_dir(camera_name)) + scan_dir(FLAT_DIR)
-    best_path, best_dist, best_tg = None, math.inf, None
-    for p, (t, g) in all_c:
-        d = distance_time_gain(time_seconds, gain, t, g)
-        if d < best_dist:
-            best_dist, best_path, best_tg = d, p, (t, g)
-    return best_path, best_dist, best_tg
+    all_c = _scan_cal_dir(flat_dir(camera_name), "flat", _FLAT_FNAME_RE, width, height)
+    all_c += _scan_cal_dir(FLAT_DIR, "flat", _FLAT_FNAME_RE, width, height)
+    return _find_nearest(all_c, time_seconds, gain)
@@ -3,10 +3,11 @@ Dark and flat field load/save and status text. All functions take the GUI instan
 Used by gui.py; gui keeps _get_camera_gain and delegates to these functions.
 """
 
+import functools
+import os
 import numpy as np
 import shutil
 import pathlib
-import dearpygui.dearpygui as dpg
 
 from ui.constants import (
     DARK_FLAT_MATCH_THRESHOLD,
@@ -18,9 +19,31 @@ from ui.constants import (
     flat_path,
     find_nearest_dark,
     find_nearest_flat,
+    invalidate_cal_dir_cache,
 )
 
 
+def _load_npy_float32(path) -> np.ndarray:
+    """Load a .npy as float32; masters are saved as float32, so this is a single read with no extra copy."""
+    return np.asarray(np.load(path), dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=4)  # current dark + flat and the previous pair (integration time/gain toggles)
+def _load_master_cached(path: str, mtime_ns: int, size: int) -> np.ndarray:
+    """Decoded master keyed by file identity; a rewritten file has a new mtime/size and misses the cache."""
+    return _load_npy_float32(path)
+
+
+def _load_master(path) -> np.ndarray:
+    """
+    Load a master .npy as float32, reusing the array from an earlier load of the same unchanged file
+    (nearest-match reloads on integration time/gain changes usually resolve to the same masters).
+    The array is shared: dark_field/flat_field are replaced by reference, never written in place.
+    """
+    st = os.stat(path)
+    return _load_master_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
 def _load_array_from_path(path: str) -> np.ndarray:
     """Load a 2D float32 array from .npy or .tif. Squeezes to 2D. Raises on error."""
     path = pathlib.Path(path)
@@ -28,7 +51,7 @@ def _load_array_from_path(path: str) -> np.ndarray:
         raise FileNotFoundError(f"Not a file: {path}")
     suf = path.suffix.lower()
     if suf == ".npy":
-        arr = np.load(path)
+        arr = _load_npy_float32(path)
     elif suf in (".tif", ".tiff"):
         try:
             import tifffile
@@ -40,7 +63,7 @@ def _load_array_from_path(path: str) -> np.ndarray:
     arr = np.squeeze(arr)
     if arr.ndim != 2:
         raise ValueError(f"Expected 2D array, got shape {arr.shape}")
-    return arr.astype(np.float32)
+    return np.asarray(arr, dtype=np.float32)
 
 
 def load_dark_field_from_path(gui, path: str) -> bool:
@@ -58,8 +81,6 @@ def load_dark_field_from_path(gui, path: str) -> bool:
     gui._dark_loaded_time_gain = None  # manual load
     gui._dark_nearest_time_gain = None
     gui._status_msg = f"Dark loaded from {pathlib.Path(path).name}"
-    if dpg.does_item_exist("dark_status"):
-        dpg.set_value("dark_status", dark_status_text(gui))
     gui._update_alteration_dark_flat_status()
     return True
 
@@ -79,8 +100,6 @@ def load_flat_field_from_path(gui, path: str) -> bool:
     gui._flat_loaded_time_gain = None  # manual load
     gui._flat_nearest_time_gain = None
     gui._status_msg = f"Flat loaded from {pathlib.Path(path).name}"
-    if dpg.does_item_exist("flat_status"):
-        dpg.set_value("flat_status", flat_status_text(gui))
     gui._update_alteration_dark_flat_status()
     return True
 
@@ -95,7 +114,7 @@ def load_dark_field(gui):
     gui._dark_nearest_time_gain = None
     if path is not None and dist <= DARK_FLAT_MATCH_THRESHOLD:
         try:
-            loaded = np.load(path).astype(np.float32)
+            loaded = _load_master(path)
             if w > 0 and h > 0 and (loaded.shape[0] != h or loaded.shape[1] != w):
                 gui.dark_field = None
             else:
@@ -110,6 +129,25 @@ def load_dark_field(gui):
             gui._status_msg = f"No dark within range (nearest {tg[0]}s @ {tg[1]})"
 
 
+def _link_or_copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """Make dst refer to src's data: a hard link when the filesystem allows it, otherwise a copy."""
+    try:
+        dst.unlink(missing_ok=True)
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _write_tiff_artifacts(arr: np.ndarray, tif_path: pathlib.Path, last_tif_path: pathlib.Path) -> None:
+    """Write the TIFF copy of a master (zlib-compressed) and its last_captured link. Runs on gui._io_executor."""
+    try:
+        import tifffile
+        tifffile.imwrite(tif_path, arr, photometric="minisblack", compression="zlib")
+        _link_or_copy(tif_path, last_tif_path)
+    except Exception:
+        pass
+
+
 def save_dark_field(gui):
     """Save master dark for current integration time, gain and resolution in camera subfolder."""
     gain = gui._get_camera_gain()
@@ -118,15 +156,11 @@ def save_dark_field(gui):
     base = dark_dir(cam)
     base.mkdir(parents=True, exist_ok=True)
     path = dark_path(gui.integration_time, gain, width, height, cam)
-    np.save(path, gui.dark_field)
-    shutil.copy2(path, base / LAST_CAPTURED_DARK_NAME)
-    arr = gui.dark_field.astype(np.float32)
-    try:
-        import tifffile
-        tifffile.imwrite(path.with_suffix(".tif"), arr, photometric="minisblack", compression=None)
-        shutil.copy2(path.with_suffix(".tif"), base / "last_captured_dark.tif")
-    except Exception:
-        pass
+    arr = np.asarray(gui.dark_field, dtype=np.float32)
+    np.save(path, arr)
+    _link_or_copy(path, base / LAST_CAPTURED_DARK_NAME)
+    invalidate_cal_dir_cache()
+    gui._io_executor.submit(_write_tiff_artifacts, arr, path.with_suffix(".tif"), base / "last_captured_dark.tif")
     gui._dark_loaded_time_gain = (gui.integration_time, gain)
     gui._dark_nearest_time_gain = None
 
@@ -141,7 +175,7 @@ def load_flat_field(gui):
     gui._flat_nearest_time_gain = None
     if path is not None and dist <= DARK_FLAT_MATCH_THRESHOLD:
         try:
-            loaded = np.load(path).astype(np.float32)
+            loaded = _load_master(path)
             if w > 0 and h > 0 and (loaded.shape[0] != h or loaded.shape[1] != w):
                 gui.flat_field = None
             else:
@@ -164,15 +198,11 @@ def save_flat_field(gui):
     base = flat_dir(cam)
     base.mkdir(parents=True, exist_ok=True)
     path = flat_path(gui.integration_time, gain, width, height, cam)
-    np.save(path, gui.flat_field)
-    shutil.copy2(path, base / LAST_CAPTURED_FLAT_NAME)
-    arr = gui.flat_field.astype(np.float32)
-    try:
-        import tifffile
-        tifffile.imwrite(path.with_suffix(".tif"), arr, photometric="minisblack", compression=None)
-        shutil.copy2(path.with_suffix(".tif"), base / "last_captured_flat.tif")
-    except Exception:
-        pass
+    arr = np.asarray(gui.flat_field, dtype=np.float32)
+    np.save(path, arr)
+    _link_or_copy(path, base / LAST_CAPTURED_FLAT_NAME)
+    invalidate_cal_dir_cache()
+    gui._io_executor.submit(_write_tiff_artifacts, arr, path.with_suffix(".tif"), base / "last_captured_flat.tif")
     gui._flat_loaded_time_gain = (gui.integration_time, gain)
     gui._flat_nearest_time_gain = None
 
@@ -181,10 +211,6 @@ def on_dark_flat_params_changed(gui):
     """Call when integration time or gain changes so dark/flat nearest-match and status are refreshed."""
     load_dark_field(gui)
     load_flat_field(gui)
-    if dpg.does_item_exist("dark_status"):
-        dpg.set_value("dark_status", dark_status_text(gui))
-    if dpg.does_item_exist("flat_status"):
-        dpg.set_value("flat_status", flat_status_text(gui))
     gui._update_alteration_dark_flat_status()
 
 
@@ -6,70 +6,157 @@ Used by gui.py. Uses dpg for texture/histogram updates.
 import numpy as np
 import dearpygui.dearpygui as dpg
 
+from lib.hist_kernels import unit_histogram
 
-def histogram_equalize(img):
-    """Histogram equalization; static helper (no gui)."""
-    flat = img.flatten()
-    lo, hi = float(flat.min()), float(flat.max())
+
+HIST_EQ_BINS = 4096  # histogram-equalization levels (12-bit; finer than the 8-bit display)
+HIST_PLOT_MAX_SAMPLES = 1 << 20  # pixels binned for the 256-bin histogram plot (strided subsample above this)
+PERCENTILE_MAX_SAMPLES = 1 << 20  # pixels binned for auto-window percentiles (strided subsample above this)
+PERCENTILE_BINS = 65536  # histogram bins over [min, max] for auto-window percentiles (lib.hist_kernels limit)
+
+
+def histogram_equalize(img, out=None, idx=None):
+    """
+    Histogram equalization; static helper (no gui). Writes into out (float32, img's shape) when given;
+    idx (uint16, img's shape) is an optional reused buffer for the bin indices.
+    The frame is quantized to HIST_EQ_BINS levels once; the same index image gives the histogram
+    (bincount) and the output (CDF lookup table), so the float data is only scanned once.
+    """
+    lo, hi = float(np.min(img)), float(np.max(img))
+    if hi <= lo:
+        if out is None:
+            return np.zeros_like(img)
+        out.fill(0.0)
+        return out
+    nbins = HIST_EQ_BINS
+    indices = np.subtract(img, lo, out=out, dtype=np.float32)  # out doubles as the float scratch
+    np.multiply(indices, np.float32((nbins - 1) / (hi - lo)), out=indices)
+    np.clip(indices, 0, nbins - 1, out=indices)
+    if idx is None:
+        indices = indices.astype(np.uint16)
+    else:
+        np.copyto(idx, indices, casting="unsafe")  # truncates like astype
+        indices = idx
+    cdf = np.cumsum(np.bincount(indices.ravel(), minlength=nbins), dtype=np.float64)
+    lut = (cdf / cdf[-1]).astype(np.float32)  # cdf[-1] is the pixel count (> 0 here)
+    return np.take(lut, indices, out=out)
+
+
+def window_frame(frame, lo: float, hi: float, out=None):
+    """Map [lo, hi] to [0, 1] (clipped) as float32, in one output buffer (out when given) without temporaries."""
     if hi <= lo:
-        return np.zeros_like(img)
-    nbins = 4096
-    hist, _ = np.histogram(flat, bins=nbins, range=(lo, hi))
-    cdf = hist.cumsum().astype(np.float64)
-    cdf_max = cdf[-1]
-    if cdf_max == 0:
-        return np.zeros_like(img)
-    cdf_norm = cdf / cdf_max
-    indices = np.clip(((img - lo) / (hi - lo) * (nbins - 1)), 0, nbins - 1).astype(np.int32)
-    return cdf_norm[indices].astype(np.float32)
+        hi = lo + 1
+    norm = np.subtract(frame, np.float32(lo), out=out, dtype=np.float32)
+    np.multiply(norm, np.float32(1.0 / (hi - lo)), out=norm)
+    np.clip(norm, 0.0, 1.0, out=norm)
+    return norm
+
+
+def downsample_for_display(gui, frame):
+    """
+    Block-mean frame by gui.disp_scale into a reused float32 buffer (texture only; processing and
+    saves keep full resolution). Edge rows/columns that do not fill a block are dropped.
+    The block sums are s + s strided whole-array adds (columns, then rows) into reused buffers, which
+    vectorize far better than np.mean over a (h, s, w, s) view.
+    """
+    s = gui.disp_scale
+    if s <= 1:
+        return frame
+    disp_h, disp_w = frame.shape[0] // s, frame.shape[1] // s
+    buf = getattr(gui, "_disp_tex_buf", None)
+    if buf is None or buf.shape != (disp_h, disp_w):
+        buf = np.empty((disp_h, disp_w), dtype=np.float32)
+        gui._disp_tex_buf = buf
+        gui._disp_row_buf = np.empty((disp_h * s, disp_w), dtype=np.float32)
+    rows = gui._disp_row_buf
+    src = frame[: disp_h * s, : disp_w * s]
+    np.add(src[:, 0::s], src[:, 1::s], out=rows, dtype=np.float32)
+    for j in range(2, s):
+        np.add(rows, src[:, j::s], out=rows, dtype=np.float32)
+    blocks = rows.reshape(disp_h, s, disp_w)
+    np.add(blocks[:, 0], blocks[:, 1], out=buf)
+    for i in range(2, s):
+        np.add(buf, blocks[:, i], out=buf)
+    np.multiply(buf, np.float32(1.0 / (s * s)), out=buf)
+    return buf
 
 
 def frame_to_texture(gui, frame):
-    """Apply windowing and convert to RGBA float32 for DPG texture. Returns (data, disp_w, disp_h)."""
+    """
+    Downsample by disp_scale, apply windowing and convert to RGBA float32 for DPG texture.
+    Returns (data, disp_w, disp_h); data is a view of a reused buffer (dpg.set_value copies it).
+    """
+    small = downsample_for_display(gui, frame)
+    win_buf = getattr(gui, "_win_tmp_f32", None)
+    if win_buf is None or win_buf.shape != small.shape:
+        win_buf = np.empty(small.shape, dtype=np.float32)
+        gui._win_tmp_f32 = win_buf
     if gui.hist_eq:
-        norm = histogram_equalize(frame)
+        idx_buf = getattr(gui, "_histeq_idx_u16", None)
+        if idx_buf is None or idx_buf.shape != small.shape:
+            idx_buf = np.empty(small.shape, dtype=np.uint16)
+            gui._histeq_idx_u16 = idx_buf
+        norm = histogram_equalize(small, out=win_buf, idx=idx_buf)
     else:
-        lo, hi = gui.win_min, gui.win_max
-        if hi <= lo:
-            hi = lo + 1
-        norm = (frame - lo) / (hi - lo)
-    norm = np.clip(norm, 0.0, 1.0).astype(np.float32)
-    disp_h = frame.shape[0] // gui.disp_scale
-    disp_w = frame.shape[1] // gui.disp_scale
-    if gui.disp_scale > 1:
-        norm = norm.reshape(disp_h, gui.disp_scale, disp_w, gui.disp_scale).mean(axis=(1, 3))
-    rgba = np.empty((disp_h, disp_w, 4), dtype=np.float32)
-    rgba[:, :, 0] = norm
-    rgba[:, :, 1] = norm
-    rgba[:, :, 2] = norm
-    rgba[:, :, 3] = 1.0
-    return rgba.ravel(), disp_w, disp_h
+        norm = window_frame(small, gui.win_min, gui.win_max, out=win_buf)
+    disp_h, disp_w = norm.shape
+    return gray_to_rgba(gui, norm), disp_w, disp_h
+
+
+def gray_to_rgba(gui, gray: np.ndarray) -> np.ndarray:
+    """
+    Flat RGBA float32 texture data for a 0–1 grayscale image, written into the reused gui._disp_rgba_buf
+    (alpha is set once per allocation). Pass the array straight to dpg.set_value; no list conversion.
+    """
+    h, w = gray.shape
+    rgba = getattr(gui, "_disp_rgba_buf", None)
+    if rgba is None or rgba.shape != (h, w, 4):
+        rgba = np.empty((h, w, 4), dtype=np.float32)
+        rgba[:, :, 3] = 1.0
+        gui._disp_rgba_buf = rgba
+    rgba[:, :, :3] = gray[:, :, np.newaxis]
+    return rgba.ravel()
 
 
 def scale_frame_to_fit(gui, frame: np.ndarray, target_w: int, target_h: int) -> np.ndarray:
-    """Scale frame to fit inside target_w x target_h (preserve aspect, letterbox). Return float32 (target_h, target_w) in 0–1."""
+    """
+    Scale frame to fit inside target_w x target_h (nearest neighbour, preserve aspect, letterbox).
+    Return float32 (target_h, target_w) in 0–1, in a buffer reused by the next call.
+    """
     if target_w <= 0 or target_h <= 0:
         return np.zeros((target_h, target_w), dtype=np.float32)
     arr = np.asarray(frame, dtype=np.float32)
     h, w = arr.shape[0], arr.shape[1]
     if h <= 0 or w <= 0:
         return np.zeros((target_h, target_w), dtype=np.float32)
-    scale = min(target_w / w, target_h / h)
-    out_w = max(1, int(round(w * scale)))
-    out_h = max(1, int(round(h * scale)))
-    yi = np.linspace(0, h - 1, out_h).astype(np.int32)
-    xi = np.linspace(0, w - 1, out_w).astype(np.int32)
-    small = arr[np.ix_(yi, xi)]
-    canvas = np.zeros((target_h, target_w), dtype=np.float32)
-    y0 = (target_h - out_h) // 2
-    x0 = (target_w - out_w) // 2
-    canvas[y0:y0 + out_h, x0:x0 + out_w] = small
+    # Sample indices, letterbox offsets and canvas depend only on the shapes: kept for repeated calls
+    key = (h, w, target_h, target_w)
+    layout = getattr(gui, "_scale_layout", None)
+    if layout is None or layout[0] != key:
+        scale = min(target_w / w, target_h / h)
+        out_w = max(1, int(round(w * scale)))
+        out_h = max(1, int(round(h * scale)))
+        yi = np.linspace(0, h - 1, out_h).astype(np.intp)
+        xi = np.linspace(0, w - 1, out_w).astype(np.intp)
+        y0 = (target_h - out_h) // 2
+        x0 = (target_w - out_w) // 2
+        canvas = np.empty((target_h, target_w), dtype=np.float32)
+        layout = (key, yi, xi, y0, x0, canvas)
+        gui._scale_layout = layout
+    _key, yi, xi, y0, x0, canvas = layout
+    out_h, out_w = len(yi), len(xi)
+    canvas.fill(0.0)
+    # Rows first (contiguous row copies), then the column gather on the already reduced array
+    rows = np.take(arr, yi, axis=0)
+    np.take(rows, xi, axis=1, out=canvas[y0:y0 + out_h, x0:x0 + out_w])
     lo, hi = float(np.min(canvas)), float(np.max(canvas))
     if hi > lo:
-        canvas = (canvas - lo) / (hi - lo)
+        np.subtract(canvas, lo, out=canvas)
+        np.divide(canvas, hi - lo, out=canvas)
+        np.clip(canvas, 0.0, 1.0, out=canvas)
     else:
-        canvas[:] = 0.5
-    return np.clip(canvas, 0.0, 1.0).astype(np.float32)
+        canvas.fill(0.5)
+    return canvas
 
 
 def get_display_max_value(gui) -> float:
@@ -98,9 +185,14 @@ def clamp_window_bounds(gui, lo: float, hi: float):
 
 
 def get_histogram_analysis_pixels(gui, frame: np.ndarray) -> np.ndarray:
-    """Pixels used for histogram/auto-window stats."""
+    """
+    Pixels used for histogram/auto-window stats (read-only: may be a view of frame).
+    The non-finite filter only gathers when a NaN/inf is actually present (rare for camera frames).
+    """
     flat = np.asarray(frame, dtype=np.float32).reshape(-1)
-    flat = flat[np.isfinite(flat)]
+    finite = np.isfinite(flat)
+    if not finite.all():
+        flat = flat[finite]
     if flat.size == 0:
         return flat
     use_bgsep_mask = bool(getattr(gui, "_bgsep_hist_ignore", True)) and bool(
@@ -114,6 +206,51 @@ def get_histogram_analysis_pixels(gui, frame: np.ndarray) -> np.ndarray:
     return flat
 
 
+def _histogram_stats(gui, frame: np.ndarray):
+    """
+    (analysis pixels, lo, hi) for frame, cached while the same frame object is repainted (window/hist-eq
+    changes), so only the histogram binning reruns. Frames shown here are replaced, never written in place.
+    """
+    key = (
+        bool(getattr(gui, "_bgsep_hist_ignore", True)),
+        bool(getattr(gui, "_bgsep_hist_active", False)),
+        getattr(gui, "_bgsep_hist_cutoff", None),
+    )
+    cached = getattr(gui, "_hist_stats_cache", None)
+    if cached is not None and cached[0] is frame and cached[1] == key:
+        return cached[2]
+    flat = get_histogram_analysis_pixels(gui, frame)
+    if flat.size:
+        stats = (flat, float(flat.min()), float(flat.max()))
+    else:
+        stats = (flat, float("nan"), float("nan"))
+    gui._hist_stats_cache = (frame, key, stats)
+    return stats
+
+
+def frame_percentiles(gui, frame: np.ndarray, qs):
+    """
+    Approximate percentiles qs (0–100) of the histogram analysis pixels, or None when there are none.
+    One histogram pass over PERCENTILE_BINS bins spanning [min, max] (lib.hist_kernels, parallel with numba)
+    and a CDF lookup instead of np.percentile's partitions; values are bin lower edges, within
+    (max - min) / PERCENTILE_BINS of the exact percentile for any value range (0–1 float images included).
+    Large frames are binned from a strided subsample of ~PERCENTILE_MAX_SAMPLES pixels (ample for 1st/99th).
+    """
+    flat, lo, hi = _histogram_stats(gui, frame)
+    if flat.size == 0:
+        return None
+    if not hi > lo:
+        return [lo] * len(qs)
+    flat = flat[:: max(1, flat.size // PERCENTILE_MAX_SAMPLES)]
+    scale = (PERCENTILE_BINS - 1) / (hi - lo)
+    if scale >= 1.0:
+        scale = float(np.floor(scale))  # whole bins per unit: integer pixel values land exactly on bin edges
+    nbins = int((hi - lo) * scale) + 1
+    cdf = np.cumsum(unit_histogram(flat, lo, scale, nbins))
+    total = float(cdf[-1])
+    return [lo + int(np.searchsorted(cdf, q / 100.0 * total)) / scale for q in qs]
+
+
 def paint_preview_raw(gui) -> None:
     """Paint _preview_frame to main view with scale-to-fit and frame's own min/max (no histogram/windowing)."""
     if gui._preview_frame is None or gui._preview_frame.size == 0 or gui._texture_id is None:
@@ -123,12 +260,7 @@ def paint_preview_raw(gui) -> None:
     if disp_w <= 0 or disp_h <= 0:
         return
     scaled = scale_frame_to_fit(gui, gui._preview_frame, disp_w, disp_h)
-    rgba = np.empty((disp_h, disp_w, 4), dtype=np.float32)
-    rgba[:, :, 0] = scaled
-    rgba[:, :, 1] = scaled
-    rgba[:, :, 2] = scaled
-    rgba[:, :, 3] = 1.0
-    dpg.set_value(gui._texture_id, rgba.ravel().tolist())
+    dpg.set_value(gui._texture_id, gray_to_rgba(gui, scaled))
     gui._force_image_refresh()
 
 
@@ -167,65 +299,87 @@ def paint_texture_from_frame(gui, frame: np.ndarray):
         gui._disp_w, gui._disp_h = disp_w, disp_h
         if gui.image_viewport is not None:
             gui.image_viewport.aspect_ratio = disp_w / disp_h if disp_h else 1.0
+        gui._resize_pending = True  # new aspect: re-fit main_image on the next tick
     else:
         dpg.set_value(gui._texture_id, texture_data)
-    flat = get_histogram_analysis_pixels(gui, frame)
-    frame_lo, frame_hi = float(flat.min()), float(flat.max())
+    flat, frame_lo, frame_hi = _histogram_stats(gui, frame)
     if not (np.isfinite(frame_lo) and np.isfinite(frame_hi)) or frame_hi <= frame_lo:
         frame_lo, frame_hi = 0.0, get_display_max_value(gui)
     frame_lo, frame_hi = clamp_window_bounds(gui, frame_lo, frame_hi)
     axis_lo = min(frame_lo, float(gui.win_min))
     axis_hi = max(frame_hi, float(gui.win_max))
     axis_lo, axis_hi = clamp_window_bounds(gui, axis_lo, axis_hi)
-    hist_vals, hist_edges = np.histogram(flat, bins=256, range=(axis_lo, axis_hi))
+    # The plot only shows the shape of the distribution: a strided subsample gives the same 256-bin curve
+    step = max(1, flat.size // HIST_PLOT_MAX_SAMPLES)
+    hist_vals, hist_edges = np.histogram(flat[::step], bins=256, range=(axis_lo, axis_hi))
     peak = hist_vals.max()
     if peak > 0:
         hist_norm = (hist_vals / peak).tolist()
     else:
         hist_norm = [0.0] * len(hist_vals)
-    hist_centers = (hist_edges[:-1] + hist_edges[1:]) / 2
-    zeros = [0] * len(hist_centers)
-    dpg.set_value("hist_series", [hist_centers.tolist(), hist_norm, zeros])
-    dpg.set_axis_limits_constraints("hist_x", axis_lo, axis_hi)
-    dpg.set_axis_limits("hist_x", axis_lo, axis_hi)
+    # Bin centers and axis limits only change with the axis range (or zoom): reuse them and skip the
+    # DPG axis calls while they are unchanged (the usual case for consecutive live frames)
+    x_lo, x_hi = axis_lo, axis_hi
     if getattr(gui, "_hist_zoom_lo", None) is not None and getattr(gui, "_hist_zoom_hi", None) is not None:
         zoom_lo = max(axis_lo, gui._hist_zoom_lo)
         zoom_hi = min(axis_hi, gui._hist_zoom_hi)
         if zoom_hi - zoom_lo >= 50 and zoom_lo < zoom_hi:
-            dpg.set_axis_limits("hist_x", zoom_lo, zoom_hi)
+            x_lo, x_hi = zoom_lo, zoom_hi
         else:
             gui._hist_zoom_lo = None
             gui._hist_zoom_hi = None
-            dpg.set_axis_limits("hist_x", axis_lo, axis_hi)
+    axis_state = (axis_lo, axis_hi, x_lo, x_hi)
+    cached = gui._hist_axis_cache
+    if cached is not None and cached[0] == axis_state:
+        centers = cached[1]
     else:
-        dpg.set_axis_limits("hist_x", axis_lo, axis_hi)
-    dpg.set_axis_limits("hist_y", 0.0, 1.05)
+        centers = ((hist_edges[:-1] + hist_edges[1:]) / 2).tolist()
+        dpg.set_axis_limits_constraints("hist_x", axis_lo, axis_hi)
+        dpg.set_axis_limits("hist_x", x_lo, x_hi)
+        dpg.set_axis_limits("hist_y", 0.0, 1.05)
+        gui._hist_axis_cache = (axis_state, centers)
+    dpg.set_value("hist_series", [centers, hist_norm, [0] * len(centers)])
 
 
 def update_display(gui):
-    """Called from main thread when new_frame_ready is set. Only updates texture when showing live."""
+    """
+    Called from main thread when new_frame_ready is set. Only updates texture when showing live.
+    Returns True if the texture was repainted (with the current window settings).
+    """
     if gui._main_view_preview_active:
-        return
+        return False
     if gui._display_mode != "live":
-        return
+        return False
     with gui.frame_lock:
-        if gui.display_frame is None:
-            return
-        frame = gui.display_frame.copy()
+        frame = gui.display_frame  # replaced (never modified) by the pipeline, so no copy needed
+    if frame is None:
+        return False
     paint_texture_from_frame(gui, frame)
+    return True
 
 
 def refresh_distortion_preview(gui):
-    """Re-run distortion+crop steps on the last pre-distortion frame and repaint (live preview when adjusting sliders)."""
+    """
+    Re-run distortion+crop steps on the last pre-distortion frame and repaint (live preview when adjusting sliders).
+    Steps whose module defines get_params_key(gui) reuse their last preview output when both their input
+    array and their parameters are unchanged, so moving a crop slider does not re-warp the frame.
+    """
     if gui._display_mode != "live":
         return
     with gui.frame_lock:
-        if gui._frame_before_distortion is None:
-            return
-        frame = gui._frame_before_distortion.copy()
+        frame = gui._frame_before_distortion
+    if frame is None:
+        return
     token = int(getattr(gui, "_pipeline_frame_token", 0))
+    cache = gui._preview_step_cache
     for _slot, _name, step in getattr(gui, "_distortion_crop_pipeline", []):
         frame_in = frame
+        key_fn = gui._pipeline_params_key_fns.get(_name)
+        key = key_fn(gui) if key_fn is not None else None
+        hit = cache.get(_name)
+        if key is not None and hit is not None and hit[0] is frame_in and hit[1] == key:
+            frame = hit[2]  # same input object and parameters: output unchanged
+            continue
         try:
             frame = step(frame, gui)
         except Exception as e:
@@ -235,6 +389,10 @@ def refresh_distortion_preview(gui):
                 flush=True,
             )
             raise
+        if key is not None:
+            cache[_name] = (frame_in, key, frame)
+        else:
+            cache.pop(_name, None)
         gui._log_pipeline_step("preview", token, _slot, _name, frame_in, frame)
     paint_texture_from_frame(gui, frame)
 
@@ -243,19 +401,20 @@ def refresh_texture_from_settings(gui):
     """Re-render current view with new windowing settings (live, raw, deconvolved, or preview)."""
     if gui._main_view_preview_active and gui._preview_frame is not None:
         if getattr(gui, "_preview_use_histogram", True):
-            paint_texture_from_frame(gui, gui._preview_frame.copy())
+            paint_texture_from_frame(gui, gui._preview_frame)
         else:
             paint_preview_raw(gui)
         return
+    # Same frame object across window changes: no copy, and the histogram stats cache stays valid
     if gui._display_mode == "live":
         with gui.frame_lock:
-            if gui.display_frame is None:
-                return
-            frame = gui.display_frame.copy()
+            frame = gui.display_frame
+        if frame is None:
+            return
     elif gui._display_mode == "raw" and gui._deconv_raw_frame is not None:
-        frame = gui._deconv_raw_frame.copy()
+        frame = gui._deconv_raw_frame
     elif gui._display_mode == "deconvolved" and gui._deconv_result is not None:
-        frame = gui._deconv_result.copy()
+        frame = gui._deconv_result
     else:
         return
     paint_texture_from_frame(gui, frame)
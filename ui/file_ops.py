@@ -9,6 +9,16 @@ import pathlib
 import numpy as np
 import dearpygui.dearpygui as dpg
 
+# Image I/O libraries are imported once here, not on each open/save (first use also registers codecs)
+try:
+    import tifffile
+except ImportError:  # optional; Pillow is used for TIFF read/write without it
+    tifffile = None
+try:
+    from PIL import Image
+except ImportError:  # optional; needed for PNG export and non-TIFF images
+    Image = None
+
 from ui.constants import (
     CAPTURES_DIR,
     DEFAULT_FRAME_W,
@@ -18,6 +28,8 @@ from ui.constants import (
     FULL_SCALE_16BIT,
 )
 
+TIFF_TILE = (512, 512)  # tiled 16-bit TIFF saves: viewers can read regions without decoding the whole image
+
 
 def _detect_effective_bit_depth_and_restretch(arr: np.ndarray, gui) -> tuple[np.ndarray, int]:
     """
@@ -92,10 +104,10 @@ def load_image_file_as_float32(gui, path: str) -> np.ndarray:
     Sets gui._last_opened_image_effective_bits. Raises on error.
     """
     try:
-        import tifffile
         arr = tifffile.imread(path)
-    except Exception:
-        from PIL import Image
+    except Exception:  # not a TIFF (or no tifffile): let Pillow read it
+        if Image is None:
+            raise
         arr = np.array(Image.open(path))
     if arr is None or arr.size == 0:
         raise ValueError("Empty or invalid image")
@@ -191,14 +203,22 @@ def cb_file_run_through_processing(gui):
     if gui._file_preview_frame is None:
         gui._status_msg = "Open an image first"
         return
+    if gui.acq_mode != "idle":
+        gui._status_msg = "Stop acquisition first"
+        return
     frame = gui._file_preview_frame
     gui._clear_main_view_preview()
+    # Only the pipeline worker touches the pipeline buffers: let it finish any queued camera frame, then
+    # run the file frame through it and wait for the result
+    gui.wait_pipeline_idle()
     gui.clear_frame_buffer()
-    gui._push_frame(frame)
+    gui.submit_raw_frame(frame)
+    gui.wait_pipeline_idle()
     gui._file_preview_frame = None
     with gui.frame_lock:
-        if gui.display_frame is not None:
-            gui._paint_texture_from_frame(gui.display_frame.copy())
+        frame = gui.display_frame
+    if frame is not None:
+        gui._paint_texture_from_frame(frame)
     gui._status_msg = "Processed; you can Save TIF"
 
 
@@ -212,6 +232,31 @@ def cb_file_save_tiff(gui):
     dpg.show_item("tiff_file_dialog")
 
 
+def _finite_range(frame: np.ndarray):
+    """(min, max) over the finite pixels, or (None, None) if there are none. Gathers only when NaN/inf is present."""
+    finite = np.isfinite(frame)
+    if finite.all():
+        return float(np.min(frame)), float(np.max(frame))
+    if not finite.any():
+        return None, None
+    return float(np.min(frame[finite])), float(np.max(frame[finite]))
+
+
+def _normalize_to_uint16(work: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """
+    Map [lo, hi] to 0..65535 (rounded, clipped; NaN -> lo, +/-inf -> hi/lo) as uint16.
+    work is a float32 scratch owned by the caller and is overwritten: every step runs in place,
+    so the only new array is the uint16 result.
+    """
+    np.nan_to_num(work, copy=False, nan=lo, posinf=hi, neginf=lo)
+    np.subtract(work, lo, out=work)
+    np.divide(work, hi - lo, out=work)
+    np.multiply(work, 65535.0, out=work)
+    np.rint(work, out=work)
+    np.clip(work, 0.0, 65535.0, out=work)
+    return work.astype(np.uint16)
+
+
 def cb_tiff_file_selected(gui, sender, app_data):
     """Handle file selected from TIFF save dialog: save 16-bit TIFF (processed or raw), update last dir."""
     filepath = app_data.get("file_path_name", "")
@@ -226,40 +271,67 @@ def cb_tiff_file_selected(gui, sender, app_data):
     if getattr(gui, "_tiff_save_raw", False):
         gui._tiff_save_raw = False
         with gui.frame_lock:
-            frame = gui.raw_frame.copy() if gui.raw_frame is not None else None
+            frame = gui.raw_frame
     else:
         frame = gui._get_export_frame()
     if frame is None:
         gui._status_msg = "No frame to save"
         return
-    frame = frame.copy().astype(np.float32)
-    finite = np.isfinite(frame)
-    if not np.any(finite):
+    frame = np.array(frame, dtype=np.float32)  # the one working copy, normalized in place below
+    lo, hi = _finite_range(frame)
+    if lo is None:
         gui._status_msg = "TIFF save failed: frame has no finite values"
         return
-    lo = float(np.min(frame[finite]))
-    hi = float(np.max(frame[finite]))
     if hi <= lo:
         arr16 = np.zeros(frame.shape, dtype=np.uint16)
     else:
-        safe = np.nan_to_num(frame, nan=lo, posinf=hi, neginf=lo)
-        scaled = (safe - lo) / (hi - lo)
-        arr16 = np.clip(np.rint(scaled * 65535.0), 0.0, 65535.0).astype(np.uint16)
+        arr16 = _normalize_to_uint16(frame, lo, hi)
     try:
-        try:
-            import tifffile
-            tifffile.imwrite(filepath, arr16, photometric="minisblack", compression=None)
-        except ImportError:
-            from PIL import Image
-            img = Image.fromarray(arr16, mode="I;16")
-            img.save(filepath, compression=None)
-            gui._status_msg = f"Saved TIFF (16-bit normalized, min={lo:.3f}, max={hi:.3f}): {filepath}"
-            return
+        if tifffile is not None:
+            # zlib level 1 with horizontal differencing: lossless, far smaller on smooth 16-bit images
+            tifffile.imwrite(
+                filepath,
+                arr16,
+                photometric="minisblack",
+                compression="zlib",
+                compressionargs={"level": 1},
+                predictor=True,
+                tile=TIFF_TILE,
+            )
+        elif Image is not None:
+            Image.fromarray(arr16, mode="I;16").save(filepath, compression=None)
+        else:
+            raise ImportError("neither tifffile nor Pillow is installed")
         gui._status_msg = f"Saved TIFF (16-bit normalized, min={lo:.3f}, max={hi:.3f}): {filepath}"
     except Exception as e:
         gui._status_msg = f"TIFF save failed: {e}"
 
 
+def _window_lut_uint16(gui, lo: float, hi: float) -> np.ndarray:
+    """65536-entry uint8 windowing LUT for uint16 (and uint8) frames; cached on gui by (lo, hi)."""
+    cache = gui._png_lut_cache
+    if cache is not None and cache[0] == lo and cache[1] == hi:
+        return cache[2]
+    xs = np.arange(65536, dtype=np.float64)
+    lut = (np.clip((xs - lo) / (hi - lo), 0, 1) * 255).astype(np.uint8)
+    gui._png_lut_cache = (lo, hi, lut)
+    return lut
+
+
+def _window_to_uint8(gui, frame: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """
+    clip((frame - lo) / (hi - lo), 0, 1) * 255 as uint8. uint8/uint16 frames (raw sensor data) go through
+    a lookup table, with no float intermediate at all; float frames are windowed in one float32 scratch.
+    """
+    if frame.dtype == np.uint16 or frame.dtype == np.uint8:
+        return _window_lut_uint16(gui, lo, hi)[frame]
+    work = np.subtract(frame, lo, dtype=np.float32)
+    np.divide(work, hi - lo, out=work)
+    np.clip(work, 0, 1, out=work)
+    np.multiply(work, 255, out=work)
+    return work.astype(np.uint8)
+
+
 def cb_file_selected(gui, sender, app_data):
     """Handle file selected from PNG export dialog: save 8-bit PNG with current windowing, update last dir."""
     filepath = app_data.get("file_path_name", "")
@@ -271,18 +343,17 @@ def cb_file_selected(gui, sender, app_data):
     if dir_path and pathlib.Path(dir_path).is_dir():
         gui._last_file_dialog_dir = dir_path
         gui._save_settings()
-    frame = gui._get_export_frame()
+    frame = gui._get_export_frame()  # read-only reference; _window_to_uint8 allocates the result
     if frame is None:
         gui._status_msg = "No frame to export"
         return
-    frame = frame.copy()
     lo, hi = gui.win_min, gui.win_max
     if hi <= lo:
         hi = lo + 1
-    normed = np.clip((frame - lo) / (hi - lo), 0, 1)
-    img8 = (normed * 255).astype(np.uint8)
+    img8 = _window_to_uint8(gui, frame, lo, hi)
     try:
-        from PIL import Image
+        if Image is None:
+            raise ImportError("Pillow is not installed")
         Image.fromarray(img8, mode='L').save(filepath)
         gui._status_msg = f"Exported: {filepath}"
     except Exception as e:
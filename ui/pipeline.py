@@ -3,37 +3,47 @@ Frame pipeline: push_frame, pipeline-from-slot/module, request_n_frames for dark
 All functions take the GUI instance. Used by gui.py and AppAPI.
 """
 
+import bisect
 import time
+import traceback
 import numpy as np
 
 
 def frame_log_signature(gui, frame: np.ndarray):
-    arr = np.asarray(frame)
-    shape = tuple(arr.shape)
+    arr = frame if isinstance(frame, np.ndarray) else np.asarray(frame)
+    shape = arr.shape
     dtype = str(arr.dtype)
     if arr.size == 0:
         return shape, dtype, [0.0]
-    flat = arr.reshape(-1)
-    idx = np.linspace(0, flat.size - 1, num=min(9, flat.size), dtype=np.int64)
-    vals = [float(flat[int(i)]) for i in idx]
+    # Sample 9 evenly spaced pixels by flat index without reshape(-1) (which copies non-contiguous frames)
+    idx = np.linspace(0, arr.size - 1, num=min(9, arr.size), dtype=np.int64)
+    vals = arr[np.unravel_index(idx, shape)].astype(np.float64).tolist()
     return shape, dtype, vals
 
 
 def log_pipeline_step(gui, context: str, token: int, slot: int, module_name: str, frame_in, frame_out):
-    """Compact per-step pipeline diagnostics for module manipulations."""
+    """
+    Compact per-step pipeline diagnostics for module manipulations (only when gui._pipeline_log_enabled).
+    Lines go to the in-memory ring gui._pipeline_log (no stdout flush per step); dump_pipeline_log prints it.
+    """
+    if not gui._pipeline_log_enabled:
+        return
     try:
         in_shape, in_dtype, in_vals = frame_log_signature(gui, frame_in)
-        out_shape, out_dtype, out_vals = frame_log_signature(gui, frame_out)
-        if len(in_vals) == len(out_vals):
-            sample_mad = float(np.mean(np.abs(np.asarray(out_vals) - np.asarray(in_vals))))
+        if frame_out is frame_in:  # pass-through step (disabled / auto-apply off): nothing to sample
+            out_shape, out_dtype, out_vals = in_shape, in_dtype, in_vals
         else:
-            sample_mad = float("nan")
-        changed = (in_shape != out_shape) or (in_dtype != out_dtype) or (sample_mad > 1e-9)
-        print(
+            out_shape, out_dtype, out_vals = frame_log_signature(gui, frame_out)
+        if in_shape != out_shape or in_dtype != out_dtype:
+            changed = True
+            sample_mad = float("nan")  # samples are not comparable
+        else:
+            sample_mad = sum(abs(o - i) for o, i in zip(out_vals, in_vals)) / len(in_vals)
+            changed = sample_mad > 1e-9
+        gui._pipeline_log.append(
             f"[Pipeline][{context}] token={token} slot={slot} module={module_name} "
             f"in={in_shape}/{in_dtype} out={out_shape}/{out_dtype} "
-            f"changed={changed} sample_mad={sample_mad:.6g}",
-            flush=True,
+            f"changed={changed} sample_mad={sample_mad:.6g}"
         )
     except Exception as e:
         print(
@@ -43,6 +53,77 @@ def log_pipeline_step(gui, context: str, token: int, slot: int, module_name: str
         )
 
 
+def dump_pipeline_log(gui, clear: bool = True):
+    """Print the buffered per-step pipeline log lines (oldest first); clear the ring unless clear=False."""
+    lines = list(gui._pipeline_log)
+    if clear:
+        gui._pipeline_log.clear()
+    if lines:
+        print("\n".join(lines), flush=True)
+
+
+def pipeline_buffers(gui, shape):
+    """Two reusable float32 buffers of the given frame shape (reallocated when the shape changes)."""
+    bufs = gui._pipeline_bufs
+    if bufs is None or bufs[0].shape != shape:
+        bufs = (np.empty(shape, dtype=np.float32), np.empty(shape, dtype=np.float32))
+        gui._pipeline_bufs = bufs
+    return bufs
+
+
+def run_step(gui, module_name: str, step, frame: np.ndarray) -> np.ndarray:
+    """
+    Run one pipeline step. Steps that accept out= write into whichever pipeline buffer does not
+    overlap their input (ping-pong), so the steps themselves allocate no per-frame arrays. The incoming
+    snapshot of a pipeline buffer (cache_incoming) is still one full-frame copy per step, into reused arrays.
+    Other steps are called as process_frame(frame, gui) and may return a new array or frame itself.
+
+    out= contract (process_frame(frame, gui, out=None)): out is a float32 array of the frame's shape that
+    never aliases frame. A step may write its result into out and return it, or return another array
+    (e.g. frame unchanged when it has nothing to do); the caller always continues with the return value.
+    out is one of the reused buffers, so its contents are only valid until the next step after that.
+    """
+    if module_name not in gui._pipeline_out_steps:
+        return step(frame, gui)
+    for out in pipeline_buffers(gui, frame.shape):
+        if not np.may_share_memory(frame, out):
+            return step(frame, gui, out=out)
+    return step(frame, gui)
+
+
+def is_pipeline_buffer(gui, frame) -> bool:
+    """True if frame is one of the reused pipeline buffers (overwritten by later steps and frames)."""
+    bufs = gui._pipeline_bufs
+    return bufs is not None and any(frame is b for b in bufs)
+
+
+def _incoming_snapshot(gui, module_name: str, frame: np.ndarray) -> np.ndarray:
+    """
+    Copy a pipeline buffer into module_name's pair of reused snapshot arrays, alternating so the array
+    currently in the cache (which a reader may be copying) is not the one overwritten.
+    """
+    pair = gui._pipeline_incoming_bufs.get(module_name)
+    if pair is None or pair[0].shape != frame.shape or pair[0].dtype != frame.dtype:
+        pair = (np.empty_like(frame), np.empty_like(frame))
+        gui._pipeline_incoming_bufs[module_name] = pair
+    item = gui._pipeline_module_cache.get(module_name)
+    dst = pair[1] if item is not None and item["frame"] is pair[0] else pair[0]
+    np.copyto(dst, frame)
+    return dst
+
+
+def cache_incoming(gui, module_name: str, token: int, slot: int, frame: np.ndarray) -> None:
+    """
+    Record the frame going into module_name. Frames a step returns as new arrays are never written
+    afterwards, so the cache keeps a reference to them (the camera frame going into the first step, outputs
+    of steps without out=). Pipeline buffers, which are the input of every out= step after the first
+    (dark/flat/banding/dead pixel), are copied on every frame into reused arrays. Consumers copy on read.
+    """
+    if is_pipeline_buffer(gui, frame):
+        frame = _incoming_snapshot(gui, module_name, frame)
+    gui._pipeline_module_cache[module_name] = {"token": token, "slot": slot, "frame": frame}
+
+
 def push_frame(gui, frame):
     """Apply alteration pipeline (dark, flat, etc.), then banding, dead pixel, distortion, crop; buffer and signal.
     When _capture_max_slot is set, run only steps with slot < _capture_max_slot and collect result (for dark/flat capture)."""
@@ -50,19 +131,15 @@ def push_frame(gui, frame):
     pipeline = getattr(gui, "_alteration_pipeline", [])
     gui._pipeline_frame_token += 1
     frame_token = gui._pipeline_frame_token
+    frame = np.ascontiguousarray(frame)
 
     if max_slot is not None:
-        for slot, module_name, step in pipeline:
-            if slot >= max_slot:
-                break
-            gui._pipeline_module_cache[module_name] = {
-                "token": frame_token,
-                "slot": slot,
-                "frame": frame.copy(),
-            }
+        end = bisect.bisect_left(gui._pipeline_slot_list, max_slot)  # steps with slot < max_slot
+        for slot, module_name, step in pipeline[:end]:
+            cache_incoming(gui, module_name, frame_token, slot, frame)
             frame_in = frame
             try:
-                frame = step(frame, gui)
+                frame = run_step(gui, module_name, step, frame)
             except Exception as e:
                 print(
                     f"[Pipeline][capture] token={frame_token} slot={slot} module={module_name} "
@@ -72,13 +149,11 @@ def push_frame(gui, frame):
                 raise
             log_pipeline_step(gui, "capture", frame_token, slot, module_name, frame_in, frame)
             time.sleep(0)  # yield GIL between pipeline steps for UI responsiveness
-        with gui.frame_lock:
-            gui._capture_frames_collect.append(frame.copy())
-            if len(gui._capture_frames_collect) >= getattr(gui, "_capture_n", 0):
-                gui._capture_frames_ready.set()
-            collect_copy = list(gui._capture_frames_collect)
-        # compute mean outside lock so we don't block main thread on np.mean
-        pending = np.mean(collect_copy, axis=0).astype(np.float32).copy()
+        # _capture_stack has its own lock; frame_lock is only taken for the preview pointer swap
+        gui._capture_stack.push(frame)
+        if len(gui._capture_stack) >= getattr(gui, "_capture_n", 0):
+            gui._capture_frames_ready.set()
+        pending = gui._capture_stack.mean()
         with gui.frame_lock:
             gui._pending_preview_frame = pending
         time.sleep(0)  # yield GIL so main thread can process HV Off / UI
@@ -87,15 +162,11 @@ def push_frame(gui, frame):
     frame_before_distortion = None
     for slot, module_name, step in pipeline:
         if slot >= gui.DISTORTION_PREVIEW_SLOT and frame_before_distortion is None:
-            frame_before_distortion = frame.copy()
-        gui._pipeline_module_cache[module_name] = {
-            "token": frame_token,
-            "slot": slot,
-            "frame": frame.copy(),
-        }
+            frame_before_distortion = frame.copy() if is_pipeline_buffer(gui, frame) else frame
+        cache_incoming(gui, module_name, frame_token, slot, frame)
         frame_in = frame
         try:
-            frame = step(frame, gui)
+            frame = run_step(gui, module_name, step, frame)
         except Exception as e:
             print(
                 f"[Pipeline][live] token={frame_token} slot={slot} module={module_name} "
@@ -106,18 +177,17 @@ def push_frame(gui, frame):
         log_pipeline_step(gui, "live", frame_token, slot, module_name, frame_in, frame)
         time.sleep(0)  # yield GIL between pipeline steps for UI responsiveness
 
+    if is_pipeline_buffer(gui, frame):
+        frame = frame.copy()  # raw_frame must outlive the next frame's writes into the pipeline buffers
+    # Integrate outside frame_lock (frame_buffer has its own lock); the UI only ever waits for the pointer swaps
+    gui.frame_buffer.push(frame, gui.integration_n)
+    integrated = gui.frame_buffer.mean()
     with gui.frame_lock:
         if frame_before_distortion is not None:
             gui._frame_before_distortion = frame_before_distortion
         gui.raw_frame = frame
-        gui.frame_buffer.append(frame)
-        if len(gui.frame_buffer) > gui.integration_n:
-            gui.frame_buffer = gui.frame_buffer[-gui.integration_n:]
-        buffer_copy = list(gui.frame_buffer)
-    # compute integrated display outside lock so we don't block main thread on np.mean
-    integrated = np.mean(buffer_copy, axis=0)
-    with gui.frame_lock:
-        gui.display_frame = integrated
+        if integrated is not None:
+            gui.display_frame = integrated
 
     gui.frame_count += 1
     now = time.time()
@@ -132,6 +202,36 @@ def push_frame(gui, frame):
     time.sleep(0)  # yield GIL after frame in pipeline so main thread can process HV Off / UI
 
 
+def submit_frame(gui, frame):
+    """
+    Queue a camera frame for the pipeline worker. Blocks only while the previous frame is still
+    waiting to be picked up, so frames are never dropped (capture_n and integration count every one).
+    """
+    gui._pipe_queue.put(frame)
+
+
+def pipeline_worker_loop(gui):
+    """Pipeline worker thread: run push_frame for each submitted frame, in order."""
+    while True:
+        frame = gui._pipe_queue.get()
+        try:
+            push_frame(gui, frame)
+        except Exception as e:
+            # Frames are dropped rather than stopping the worker; surface it in the status bar and record it
+            # so a capture or request_integration waiting on this frame can fail with a specific reason
+            print(f"[Pipeline][worker] frame dropped: {e}", flush=True)
+            traceback.print_exc()
+            gui._pipeline_error = f"{type(e).__name__}: {e}"
+            gui._status_msg = f"Pipeline error, frame dropped: {e}"
+        finally:
+            gui._pipe_queue.task_done()
+
+
+def wait_pipeline_idle(gui):
+    """Block until all submitted frames have been processed (not from the pipeline worker itself)."""
+    gui._pipe_queue.join()
+
+
 def get_module_incoming_image(gui, module_name: str):
     item = gui._pipeline_module_cache.get(module_name)
     if not item:
@@ -160,14 +260,9 @@ def continue_pipeline_from_slot(gui, frame: np.ndarray, start_slot_exclusive: in
     module run so get_module_incoming_image() reflects the last manual or live run."""
     out = np.asarray(frame, dtype=np.float32)
     token = int(getattr(gui, "_pipeline_frame_token", 0))
-    for slot, _module_name, step in getattr(gui, "_alteration_pipeline", []):
-        if slot <= start_slot_exclusive:
-            continue
-        gui._pipeline_module_cache[_module_name] = {
-            "token": token,
-            "slot": slot,
-            "frame": out.copy(),
-        }
+    start = bisect.bisect_right(gui._pipeline_slot_list, start_slot_exclusive)
+    for slot, _module_name, step in gui._alteration_pipeline[start:]:
+        cache_incoming(gui, _module_name, token, slot, out)
         frame_in = out
         try:
             out = step(out, gui)
@@ -197,7 +292,8 @@ def continue_pipeline_from_module(gui, module_name: str, frame: np.ndarray):
             flush=True,
         )
         slot = -1
-    downstream = [n for s, n, _pf in getattr(gui, "_alteration_pipeline", []) if s > slot]
+    start = bisect.bisect_right(gui._pipeline_slot_list, slot)
+    downstream = [n for _s, n, _pf in gui._alteration_pipeline[start:]]
     print(
         f"[Pipeline][manual-continue] module={module_name} start_slot={slot} downstream={downstream}",
         flush=True,
@@ -207,8 +303,9 @@ def continue_pipeline_from_module(gui, module_name: str, frame: np.ndarray):
 
 def output_manual_from_module(gui, module_name: str, frame: np.ndarray):
     out = continue_pipeline_from_module(gui, module_name, frame)
+    published = out.copy()  # out may be the caller's own array; copy before taking the lock
     with gui.frame_lock:
-        gui.display_frame = out.copy()
+        gui.display_frame = published
     gui._display_mode = "live"
     gui._paint_texture_from_frame(out)
     gui._force_image_refresh()
@@ -236,10 +333,11 @@ def request_n_frames_processed_up_to_slot(
     if gui.acq_mode != "idle":
         return None
     gui._capture_max_slot = max_slot
-    gui._capture_frames_collect = []
+    gui._capture_stack.clear()
     gui._capture_n = n
     gui._capture_frames_ready.clear()
     gui._capture_skip_beam = dark_capture
+    gui._pipeline_error = None
     gui.integration_n = n
     gui.acq_stop.clear()
     gui._progress = 0.0
@@ -257,7 +355,7 @@ def request_n_frames_processed_up_to_slot(
                 if not beam.turn_on_and_wait_ready(should_cancel=lambda: gui.acq_stop.is_set()):
                     gui._progress_text = ""
                     gui._capture_max_slot = None
-                    gui._capture_frames_collect = []
+                    gui._capture_stack.clear()
                     gui._capture_n = 0
                     gui._capture_skip_beam = False
                     if gui.acq_stop.is_set():
@@ -267,26 +365,29 @@ def request_n_frames_processed_up_to_slot(
                     return None
                 gui._progress_text = ""
 
+    gui._acq_idle_event.clear()
     gui.acq_mode = "capture_n"
     gui.camera_module.start_acquisition(gui)
     t0 = time.time()
     while not gui._capture_frames_ready.wait(timeout=0.2):
-        if gui.acq_stop.is_set():
-            gui._stop_acquisition()
+        if gui.acq_stop.is_set() or gui._pipeline_error is not None:
+            gui._stop_acquisition()  # a dropped frame means N will never be collected
             break
         if (time.time() - t0) > timeout_seconds:
             gui._stop_acquisition()
             break
     # Wait for worker to reach idle (e.g. DC5 can be stuck in one long frame). Give extra time.
-    while gui.acq_mode != "idle" and (time.time() - t0) < timeout_seconds + 15:
-        if gui.acq_stop.is_set():
+    while not gui.acq_stop.is_set() and (time.time() - t0) < timeout_seconds + 15:
+        if gui._acq_idle_event.wait(timeout=0.2):
             break
-        time.sleep(0.05)
-    collected = getattr(gui, "_capture_frames_collect", [])
+    n_collected = len(gui._capture_stack)
+    result = gui._capture_stack.mean()
     gui._capture_max_slot = None
-    gui._capture_frames_collect = []
+    gui._capture_stack.clear()
     gui._capture_n = 0
     gui._capture_skip_beam = False
-    if len(collected) < n:
+    if n_collected < n:
+        if gui._pipeline_error is not None:
+            gui._status_msg = f"Capture failed: pipeline error ({gui._pipeline_error})"
         return None
-    return np.mean(collected, axis=0).astype(np.float32)
+    return result
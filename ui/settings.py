@@ -7,6 +7,16 @@ import time
 import dearpygui.dearpygui as dpg
 
 from lib.settings import save_settings
+from modules.registry import load_module
+
+
+def _write_settings(gui, s: dict):
+    """
+    Write settings on gui._io_executor. The dict is built on the main thread (it reads DPG); the file
+    read-merge-write runs on the single I/O worker, so writes stay ordered and never block a UI tick.
+    Every settings.json writer (set_current_profile, apply_profile too) goes through this executor.
+    """
+    gui._io_executor.submit(save_settings, s, gui._extra_settings_keys)
 
 
 def request_save(gui, scope: str = "full", debounce_s: float = None):
@@ -15,11 +25,15 @@ def request_save(gui, scope: str = "full", debounce_s: float = None):
         return
     if scope not in ("window", "full"):
         scope = "full"
-    if debounce_s is None:
-        debounce_s = gui._settings_save_debounce_s
     gui._settings_save_pending = True
     if scope == "full" or gui._settings_save_scope != "full":
         gui._settings_save_scope = scope
+    if debounce_s is None:
+        # Window-only saves (histogram drags) coalesce over a longer interval; they never sweep modules
+        if gui._settings_save_scope == "window":
+            debounce_s = gui._settings_save_window_debounce_s
+        else:
+            debounce_s = gui._settings_save_debounce_s
     gui._settings_save_deadline = time.monotonic() + max(0.0, float(debounce_s))
 
 
@@ -51,7 +65,7 @@ def save_settings_now(gui):
         s[f"load_{m['name']}_module"] = gui._module_enabled.get(m["name"], False)
     try:
         if not dpg.does_item_exist("acq_mode_combo"):
-            save_settings(s, extra_keys=gui._extra_settings_keys)
+            _write_settings(gui, s)
             return
         s["acq_mode"] = dpg.get_value("acq_mode_combo")
         s["integ_time"] = dpg.get_value("integ_time_combo")
@@ -60,10 +74,11 @@ def save_settings_now(gui):
         s["win_max"] = float(dpg.get_value("win_max_drag"))
         s["hist_eq"] = dpg.get_value("hist_eq_cb")
         s["disp_scale"] = gui.disp_scale
+        s["integration_float16"] = bool(getattr(gui, "integration_float16", False))
         s["last_file_dialog_dir"] = getattr(gui, "_last_file_dialog_dir", "") or ""
         for m in gui._discovered_modules:
             try:
-                mod = __import__(m["import_path"], fromlist=["get_settings_for_save"])
+                mod = load_module(m)
                 get_save = getattr(mod, "get_settings_for_save", None)
                 if callable(get_save):
                     for k, v in get_save(gui).items():
@@ -72,7 +87,7 @@ def save_settings_now(gui):
                 pass
     except Exception:
         pass
-    save_settings(s, extra_keys=gui._extra_settings_keys)
+    _write_settings(gui, s)
 
 
 def save_windowing_now(gui):
@@ -84,7 +99,7 @@ def save_windowing_now(gui):
         "win_max": float(gui.win_max),
         "hist_eq": bool(gui.hist_eq),
     }
-    save_settings(s, extra_keys=gui._extra_settings_keys)
+    _write_settings(gui, s)
 
 
 def get_current_settings_dict(gui):
@@ -108,9 +123,10 @@ def get_current_settings_dict(gui):
         s["win_max"] = float(dpg.get_value("win_max_drag"))
         s["hist_eq"] = dpg.get_value("hist_eq_cb")
         s["disp_scale"] = gui.disp_scale
+        s["integration_float16"] = bool(getattr(gui, "integration_float16", False))
         for m in gui._discovered_modules:
             try:
-                mod = __import__(m["import_path"], fromlist=["get_settings_for_save"])
+                mod = load_module(m)
                 get_save = getattr(mod, "get_settings_for_save", None)
                 if callable(get_save):
                     for k, v in get_save(gui).items():